@@ -7,69 +7,101 @@ In production, this would use an LLM for sophisticated literary analysis.
 For this demo, we use template-based analysis.
 """
 
-import json
+import functools
+import os
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+import json_codec
+
+FORM_CORRECT = "correct"
+
+# Markdown row for the form-adherence table: sport, haiku form, sonnet form
+FORM_TABLE_ROW = "| %s | %s | %s |\n"
+
+
+def _read_optional(path: Path, binary: bool = False):
+    """Return a file's contents, or an empty str/bytes if it does not exist."""
+    try:
+        return path.read_bytes() if binary else path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return b"" if binary else ""
+
+
+def read_sport_dir(sport_dir: Path) -> Optional[Dict[str, Any]]:
+    """Read haiku, sonnet, and metadata for one sport directory."""
+    # Read files if they exist (open() reports a missing file; no separate stat)
+    haiku_text = _read_optional(sport_dir / "haiku.txt")
+    sonnet_text = _read_optional(sport_dir / "sonnet.txt")
+    metadata_bytes = _read_optional(sport_dir / "metadata.json", binary=True)
+    metadata = json_codec.loads(metadata_bytes) if metadata_bytes else {}
+
+    if not (haiku_text or sonnet_text):
+        return None
+
+    return {
+        "sport": sport_dir.name,
+        "haiku": haiku_text,
+        "sonnet": sonnet_text,
+        "metadata": metadata
+    }
 
 
 def read_poem_files(session_dir: str = "output") -> List[Dict[str, Any]]:
     """Read all poetry files from session output directory."""
     output_dir = Path(session_dir)
-    poems = []
 
     if not output_dir.exists():
-        return poems
-
-    for sport_dir in sorted(output_dir.iterdir()):
-        if not sport_dir.is_dir():
-            continue
-
-        sport_name = sport_dir.name
-        haiku_file = sport_dir / "haiku.txt"
-        sonnet_file = sport_dir / "sonnet.txt"
-        metadata_file = sport_dir / "metadata.json"
-
-        # Read files if they exist
-        haiku_text = ""
-        sonnet_text = ""
-        metadata = {}
-
-        if haiku_file.exists():
-            with open(haiku_file, "r") as f:
-                haiku_text = f.read()
-
-        if sonnet_file.exists():
-            with open(sonnet_file, "r") as f:
-                sonnet_text = f.read()
-
-        if metadata_file.exists():
-            with open(metadata_file, "r") as f:
-                metadata = json.load(f)
-
-        if haiku_text or sonnet_text:
-            poems.append({
-                "sport": sport_name,
-                "haiku": haiku_text,
-                "sonnet": sonnet_text,
-                "metadata": metadata
-            })
+        return []
+
+    # DirEntry.is_dir() uses the d_type cached by scandir, avoiding a stat per entry
+    with os.scandir(output_dir) as entries:
+        sport_dirs = [Path(e.path) for e in sorted(entries, key=lambda e: e.name) if e.is_dir()]
 
+    poems = []
+    for sport_dir in sport_dirs:
+        poem = read_sport_dir(sport_dir)
+        if poem is not None:
+            poems.append(poem)
     return poems
 
 
+def count_nonblank_lines(text: str) -> int:
+    """Count lines that contain something other than whitespace."""
+    return sum(1 for line in text.splitlines() if line.strip())
+
+
+def first_lines(text: str, n: int) -> str:
+    """Return the first n lines of text without splitting the whole string."""
+    end = -1
+    for _ in range(n):
+        end = text.find("\n", end + 1)
+        if end < 0:
+            return text
+    return text[:end]
+
+
+@functools.lru_cache(maxsize=64)
+def form_label(line_count: int, expected_lines: int) -> str:
+    """Describe form adherence; cached because line counts repeat across sports."""
+    if line_count == expected_lines:
+        return FORM_CORRECT
+    return f"incorrect ({line_count} lines)"
+
+
 def analyze_form_adherence(poems: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Analyze how well poems adhere to traditional forms."""
     analysis = {}
 
     for poem_data in poems:
         sport = poem_data["sport"]
-        haiku_lines = len([l for l in poem_data["haiku"].split("\n") if l.strip()])
-        sonnet_lines = len([l for l in poem_data["sonnet"].split("\n") if l.strip()])
+        haiku_lines = count_nonblank_lines(poem_data["haiku"])
+        sonnet_lines = count_nonblank_lines(poem_data["sonnet"])
 
         analysis[sport] = {
-            "haiku_form": "correct" if haiku_lines == 3 else f"incorrect ({haiku_lines} lines)",
-            "sonnet_form": "correct" if sonnet_lines == 14 else f"incorrect ({sonnet_lines} lines)"
+            "haiku_form": form_label(haiku_lines, 3),
+            "sonnet_form": form_label(sonnet_lines, 14)
         }
 
     return analysis
@@ -94,7 +126,7 @@ def analyze_execution_logs(session_dir: str) -> Dict[str, Any]:
     with open(log_file, "r") as f:
         for line in f:
             if line.strip():
-                event = json.loads(line)
+                event = json_codec.loads(line)
                 stats["total_events"] += 1
 
                 action = event.get("action", "unknown")
@@ -128,97 +160,126 @@ def generate_analysis_report(poems: List[Dict[str, Any]], session_dir: str = "ou
     if not poems:
         return "# Analysis Report\n\nNo poems found to analyze.\n"
 
-    report = []
-    report.append("# Sports Poetry Analysis Report\n")
-    report.append(f"**Report Generated**: {datetime.now(timezone.utc).isoformat()}\n")
-    report.append(f"**Total Sports Analyzed**: {len(poems)}\n")
-    report.append("\n---\n")
+    generated_at = datetime.now(timezone.utc).isoformat()
+    num_sports = len(poems)
+
+    sections = []
+    sections.append(
+        "# Sports Poetry Analysis Report\n"
+        f"**Report Generated**: {generated_at}\n"
+        f"**Total Sports Analyzed**: {num_sports}\n"
+        "\n---\n"
+    )
 
     # Executive Summary
-    report.append("## Executive Summary\n")
-    report.append(f"This report analyzes poetry generated for {len(poems)} different sports. ")
-    report.append("Each sport is represented by a haiku (3-line poem) and a sonnet (14-line poem). ")
-    report.append("The analysis examines form adherence and execution metrics.\n")
+    sections.append(
+        "## Executive Summary\n"
+        f"This report analyzes poetry generated for {num_sports} different sports. "
+        "Each sport is represented by a haiku (3-line poem) and a sonnet (14-line poem). "
+        "The analysis examines form adherence and execution metrics.\n"
+    )
 
     # Form Analysis
     form_analysis = analyze_form_adherence(poems)
-    report.append("\n## Form Adherence Analysis\n")
 
-    all_haiku_correct = all(v["haiku_form"] == "correct" for v in form_analysis.values())
-    all_sonnet_correct = all(v["sonnet_form"] == "correct" for v in form_analysis.values())
+    # One pass over both forms; stop as soon as neither can still be all-correct
+    all_haiku_correct = all_sonnet_correct = True
+    for v in form_analysis.values():
+        if v["haiku_form"] != FORM_CORRECT:
+            all_haiku_correct = False
+        if v["sonnet_form"] != FORM_CORRECT:
+            all_sonnet_correct = False
+        if not (all_haiku_correct or all_sonnet_correct):
+            break
 
     if all_haiku_correct and all_sonnet_correct:
-        report.append("All poems correctly follow traditional forms (3 lines for haiku, 14 for sonnets).\n")
+        sections.append(
+            "\n## Form Adherence Analysis\n"
+            "All poems correctly follow traditional forms (3 lines for haiku, 14 for sonnets).\n"
+        )
     else:
-        report.append("| Sport | Haiku Form | Sonnet Form |\n")
-        report.append("|-------|------------|-------------|\n")
-        for sport, analysis in form_analysis.items():
-            report.append(f"| {sport} | {analysis['haiku_form']} | {analysis['sonnet_form']} |\n")
+        # A materialized list lets str.join size the result in one pass
+        rows = "".join([
+            FORM_TABLE_ROW % (sport, analysis["haiku_form"], analysis["sonnet_form"])
+            for sport, analysis in form_analysis.items()
+        ])
+        sections.append(
+            "\n## Form Adherence Analysis\n"
+            "| Sport | Haiku Form | Sonnet Form |\n"
+            "|-------|------------|-------------|\n"
+            f"{rows}"
+        )
 
     # Per-Sport Analysis
-    report.append("\n## Individual Sport Analysis\n")
+    sections.append("\n## Individual Sport Analysis\n")
 
     for poem_data in poems:
         sport = poem_data["sport"]
         metadata = poem_data["metadata"]
-
-        report.append(f"\n### {sport.title()}\n")
-
-        report.append("\n**Haiku:**\n```\n")
-        report.append(poem_data["haiku"])
-        report.append("```\n")
-
-        report.append("\n**Sonnet (excerpt):**\n```\n")
         # Show first 4 lines of sonnet
-        sonnet_lines = poem_data["sonnet"].split("\n")
-        report.append("\n".join(sonnet_lines[:4]))
-        report.append("\n... (see full sonnet in output directory)\n```\n")
-
-        report.append(f"\n**Metrics:**\n")
-        report.append(f"- Haiku: {metadata.get('haiku_lines', 0)} lines, {metadata.get('haiku_words', 0)} words\n")
-        report.append(f"- Sonnet: {metadata.get('sonnet_lines', 0)} lines, {metadata.get('sonnet_words', 0)} words\n")
-        report.append(f"- Generation time: {metadata.get('duration_s', 0)}s\n")
+        sonnet_excerpt = first_lines(poem_data["sonnet"], 4)
+
+        sections.append(
+            f"\n### {sport.title()}\n"
+            "\n**Haiku:**\n```\n"
+            f"{poem_data['haiku']}"
+            "```\n"
+            "\n**Sonnet (excerpt):**\n```\n"
+            f"{sonnet_excerpt}"
+            "\n... (see full sonnet in output directory)\n```\n"
+            "\n**Metrics:**\n"
+            f"- Haiku: {metadata.get('haiku_lines', 0)} lines, {metadata.get('haiku_words', 0)} words\n"
+            f"- Sonnet: {metadata.get('sonnet_lines', 0)} lines, {metadata.get('sonnet_words', 0)} words\n"
+            f"- Generation time: {metadata.get('duration_s', 0)}s\n"
+        )
 
     # Workflow Execution Analysis
     exec_stats = analyze_execution_logs(session_dir)
     if exec_stats:
-        report.append("\n## Workflow Execution Analysis\n")
-        report.append(f"**Total Events Logged:** {exec_stats['total_events']}\n\n")
-        report.append(f"**Agent Statistics:**\n")
-        report.append(f"- Agents Launched: {exec_stats['agents_launched']}\n")
-        report.append(f"- Agents Completed: {exec_stats['agents_completed']}\n")
-        report.append(f"- Agents Failed: {exec_stats['agents_failed']}\n")
-        report.append(f"- Retry Attempts: {exec_stats['retry_count']}\n")
+        sections.append(
+            "\n## Workflow Execution Analysis\n"
+            f"**Total Events Logged:** {exec_stats['total_events']}\n\n"
+            "**Agent Statistics:**\n"
+            f"- Agents Launched: {exec_stats['agents_launched']}\n"
+            f"- Agents Completed: {exec_stats['agents_completed']}\n"
+            f"- Agents Failed: {exec_stats['agents_failed']}\n"
+            f"- Retry Attempts: {exec_stats['retry_count']}\n"
+        )
 
         if exec_stats['events_by_action']:
-            report.append(f"\n**Event Breakdown:**\n")
-            for action, count in sorted(exec_stats['events_by_action'].items()):
-                report.append(f"- {action}: {count}\n")
+            breakdown = "".join([
+                f"- {action}: {count}\n"
+                for action, count in sorted(exec_stats['events_by_action'].items())
+            ])
+            sections.append(f"\n**Event Breakdown:**\n{breakdown}")
 
     # Failed/Missing Sports
-    report.append("\n## Missing or Failed Sports\n")
-    expected_sports_from_config = []
+    # The orchestrator copies the run's config into the session directory;
+    # fall back to the working-directory config for standalone runs
+    session_config = Path(session_dir) / "config.json"
+    config_path = session_config if session_config.exists() else Path("config.json")
+    expected_sports = set()
     try:
-        with open("config.json", "r") as f:
-            config = json.load(f)
-            expected_sports_from_config = config.get("sports", [])
+        expected_sports = set(json_codec.loads(config_path.read_bytes()).get("sports", []))
     except:
         pass
 
-    analyzed_sports = set(p["sport"] for p in poems)
-    expected_sports = set(expected_sports_from_config)
+    analyzed_sports = {p["sport"] for p in poems}
     missing_sports = expected_sports - analyzed_sports
 
     if missing_sports:
-        report.append(f"The following sports were expected but not found: {', '.join(missing_sports)}\n")
+        missing_summary = f"The following sports were expected but not found: {', '.join(missing_sports)}\n"
     else:
-        report.append("All expected sports were successfully analyzed.\n")
+        missing_summary = "All expected sports were successfully analyzed.\n"
+    sections.append(f"\n## Missing or Failed Sports\n{missing_summary}")
 
     # Footer
-    report.append("\n---\n")
-    report.append("\n*This analysis was generated by the Sports Poetry Multi-Agent Workflow*\n")
+    sections.append(
+        "\n---\n"
+        "\n*This analysis was generated by the Sports Poetry Multi-Agent Workflow*\n"
+    )
 
-    return "".join(report)
+    return "".join(sections)
 
 
 def main():
@@ -5,12 +5,21 @@ Configuration Builder for Sports Poetry Demo
 Provides validation and generation of config files with a testable API.
 """
 
+import copy
 import json
+import os
 from pathlib import Path
-from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any
 
 
+# Parsed default configs keyed by (absolute path, mtime_ns); a changed file
+# gets a new key, so stale entries are never served.
+_DEFAULT_CACHE: Dict[tuple, Dict[str, Any]] = {}
+
+# Fields generated at runtime by the orchestrator, never compared to defaults
+RUNTIME_FIELDS = frozenset({"session_id", "timestamp"})
+
+
 class ConfigValidationError(Exception):
     """Raised when config validation fails."""
     pass
@@ -19,9 +28,14 @@ class ConfigValidationError(Exception):
 class ConfigBuilder:
     """Builder for creating and validating sports poetry configuration files."""
 
-    # Valid configuration options
-    VALID_GENERATION_MODES = ["template", "llm"]
-    VALID_LLM_PROVIDERS = ["together", "huggingface"]
+    # Valid configuration options (frozensets for O(1) membership checks;
+    # the choice strings for error messages are formatted once, in order)
+    _GENERATION_MODES = ("template", "llm")
+    _LLM_PROVIDERS = ("together", "huggingface")
+    VALID_GENERATION_MODES = frozenset(_GENERATION_MODES)
+    VALID_LLM_PROVIDERS = frozenset(_LLM_PROVIDERS)
+    _GENERATION_MODE_CHOICES = ", ".join(_GENERATION_MODES)
+    _LLM_PROVIDER_CHOICES = ", ".join(_LLM_PROVIDERS)
     MIN_SPORTS = 3
     MAX_SPORTS = 5
 
@@ -65,16 +79,18 @@ class ConfigBuilder:
                 f"Cannot specify more than {self.MAX_SPORTS} sports (got {len(sports)})"
             )
 
-        # Normalize sport names (lowercase, strip whitespace)
-        normalized_sports = [sport.strip().lower() for sport in sports]
-
-        # Check for duplicates
-        if len(normalized_sports) != len(set(normalized_sports)):
-            raise ConfigValidationError("Sports list contains duplicates")
-
-        # Check for empty strings
-        if any(not sport for sport in normalized_sports):
-            raise ConfigValidationError("Sports list contains empty values")
+        # Normalize sport names (lowercase, strip whitespace) and reject
+        # empty or duplicate entries in the same pass
+        normalized_sports = []
+        seen = set()
+        for sport in sports:
+            normalized = sport.strip().lower()
+            if not normalized:
+                raise ConfigValidationError("Sports list contains empty values")
+            if normalized in seen:
+                raise ConfigValidationError("Sports list contains duplicates")
+            seen.add(normalized)
+            normalized_sports.append(normalized)
 
         self.config["sports"] = normalized_sports
         return self
@@ -108,7 +124,7 @@ class ConfigBuilder:
         if mode not in self.VALID_GENERATION_MODES:
             raise ConfigValidationError(
                 f"Invalid generation mode: {mode}. "
-                f"Must be one of: {', '.join(self.VALID_GENERATION_MODES)}"
+                f"Must be one of: {self._GENERATION_MODE_CHOICES}"
             )
 
         self.config["generation_mode"] = mode
@@ -135,7 +151,7 @@ class ConfigBuilder:
         if provider not in self.VALID_LLM_PROVIDERS:
             raise ConfigValidationError(
                 f"Invalid LLM provider: {provider}. "
-                f"Must be one of: {', '.join(self.VALID_LLM_PROVIDERS)}"
+                f"Must be one of: {self._LLM_PROVIDER_CHOICES}"
             )
 
         # Ensure LLM config exists
@@ -204,8 +220,7 @@ class ConfigBuilder:
         """
         config = self.validate()
         config_file_path = Path(path)
-        with open(config_file_path, "w") as f:
-            json.dump(config, f, indent=2)
+        config_file_path.write_text(json.dumps(config, indent=2))
         return config_file_path
 
     @staticmethod
@@ -213,14 +228,27 @@ class ConfigBuilder:
         """
         Create a ConfigBuilder from an existing config dictionary.
 
+        Values from ``data`` are merged over the builder defaults, so fields
+        missing from older or partial configs keep their default values.
+        The caller's dictionary is never modified: the nested "llm" section
+        (the only value the builder updates in place) is copied.
+
         Args:
             data: Configuration dictionary
 
         Returns:
             New ConfigBuilder instance with the given config
         """
+        builder = ConfigBuilder._wrap(data)
+        if isinstance(data.get("llm"), dict):
+            builder.config["llm"] = dict(data["llm"])
+        return builder
+
+    @staticmethod
+    def _wrap(config: Dict[str, Any]) -> 'ConfigBuilder':
+        """Merge a config dict the builder may own outright over the defaults."""
         builder = ConfigBuilder()
-        builder.config = data.copy()
+        builder.config.update(config)
         return builder
 
     @staticmethod
@@ -237,13 +265,17 @@ class ConfigBuilder:
         with open(path, "r") as f:
             data = json.load(f)
 
-        return ConfigBuilder.from_dict(data)
+        # Freshly parsed, so nothing else holds a reference to it
+        return ConfigBuilder._wrap(data)
 
     @staticmethod
     def load_default(path: str = "config.default.json") -> 'ConfigBuilder':
         """
         Load the default configuration template.
 
+        The parsed file is cached per path and modification time, so repeated
+        calls skip the JSON parse until the file changes on disk.
+
         Args:
             path: Path to the default config file
 
@@ -254,12 +286,22 @@ class ConfigBuilder:
             FileNotFoundError: If config.default.json doesn't exist
             ConfigValidationError: If default config is invalid
         """
-        if not Path(path).exists():
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
             raise FileNotFoundError(
                 f"Default config not found: {path}\n"
                 f"Repository may be corrupted. This file must exist."
-            )
-        return ConfigBuilder.load(path)
+            ) from None
+
+        cache_key = (os.path.abspath(path), mtime_ns)
+        default_config = _DEFAULT_CACHE.get(cache_key)
+        if default_config is None:
+            default_config = ConfigBuilder.load(path).config
+            _DEFAULT_CACHE[cache_key] = default_config
+
+        # Deep copy so callers can mutate nested values (e.g. "llm") freely
+        return ConfigBuilder._wrap(copy.deepcopy(default_config))
 
 
 def compute_changes_from_default(default_config: Dict[str, Any],
@@ -267,6 +309,8 @@ def compute_changes_from_default(default_config: Dict[str, Any],
     """
     Compare new config against default template.
 
+    Runtime-generated fields (session_id, timestamp) are not reported.
+
     Args:
         default_config: The default configuration
         new_config: The new configuration to compare
@@ -279,11 +323,14 @@ def compute_changes_from_default(default_config: Dict[str, Any],
     changed_fields = []
     changes = {}
 
-    for key in new_config:
+    for key, new_value in new_config.items():
+        if key in RUNTIME_FIELDS:
+            continue
+
         default_value = default_config.get(key)
-        new_value = new_config[key]
 
-        if default_value != new_value:
+        # Identity check short-circuits shared/interned values before __eq__
+        if default_value is not new_value and default_value != new_value:
             changed_fields.append(key)
             changes[key] = {
                 "old": default_value,
@@ -0,0 +1,36 @@
+"""
+JSON encoding shared by the orchestrator and agents.
+
+orjson is an optional speedup; without it the stdlib codec is used with the
+same compact output, so files look alike whichever one wrote them.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(obj: Any) -> bytes:
+        """Encode obj as compact UTF-8 JSON."""
+        return orjson.dumps(obj)
+
+    def dumps_pretty(obj: Any) -> bytes:
+        """Encode obj as UTF-8 JSON indented by two spaces."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+else:
+    loads = json.loads
+
+    def dumps(obj: Any) -> bytes:
+        """Encode obj as compact UTF-8 JSON."""
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def dumps_pretty(obj: Any) -> bytes:
+        """Encode obj as UTF-8 JSON indented by two spaces."""
+        return json.dumps(obj, indent=2).encode()
@@ -6,19 +6,38 @@ Coordinates multiple poetry generation agents in parallel,
 with full provenance logging and graceful error handling.
 """
 
-import json
 import time
 import sys
 import os
-import subprocess
 import uuid
-import argparse
+import random
+import atexit
+import queue
 import shutil
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import List, Dict, Any
 import threading
-import concurrent.futures
+
+import json_codec
+import poetry_agent
+
+
+# Base delay before retrying a failed LLM agent; jittered so agents that hit
+# the same rate limit together do not all retry at the same instant
+RETRY_BACKOFF_S = 2.0
+
+# Poem metrics copied from each agent's metadata into its result row
+AGENT_METRIC_KEYS = ("haiku_lines", "sonnet_lines", "haiku_words", "sonnet_words")
+
+# Resolved next to this module so the workflow can run from any directory
+ANALYZER_SCRIPT = Path(__file__).resolve().with_name("analyzer_agent.py")
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().with_name("config.default.json")
+
+
+def agent_result(sport: str, status: str, **fields: Any) -> Dict[str, Any]:
+    """Build a per-agent result row (the shape stored in usage_log agent_results)."""
+    return {"sport": sport, "status": status, **fields}
 
 
 def generate_session_id() -> str:
@@ -52,7 +71,7 @@ def create_session_changelog(config: Dict[str, Any], session_id: str,
     from config_builder import ConfigBuilder, compute_changes_from_default
 
     # Load default config for comparison
-    default_builder = ConfigBuilder.load_default()
+    default_builder = ConfigBuilder.load_default(str(DEFAULT_CONFIG_PATH))
     default_config = default_builder.config
 
     # Compute differences
@@ -62,7 +81,7 @@ def create_session_changelog(config: Dict[str, Any], session_id: str,
 
     # Create changelog
     changelog = {
-        "timestamp": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
         "session_id": session_id,
         "user": user,
         "reason": reason,
@@ -71,17 +90,45 @@ def create_session_changelog(config: Dict[str, Any], session_id: str,
     }
 
     # Write to session directory
+    # Serialize up front so the file is written with a single write call
     changelog_path = session_dir / "config.changelog.json"
-    with open(changelog_path, "w") as f:
-        json.dump(changelog, f, indent=2)
+    changelog_path.write_bytes(json_codec.dumps_pretty(changelog))
 
 
 class ProvenanceLogger:
-    """Handles detailed execution logging for full auditability."""
+    """Handles detailed execution logging for full auditability.
+
+    Events are encoded by the calling thread and queued with their wall-clock
+    time; a single daemon writer thread formats the timestamps and appends
+    whatever has accumulated with one write per file. Call flush() before
+    anything else reads the log file, and close() once the logger is done.
+    """
+
+    _STOP = object()  # Queued by close() to end the writer thread
 
-    def __init__(self, log_file: str = "execution_log.jsonl"):
+    def __init__(self, log_file: str = "execution_log.jsonl", echo: bool = True):
         self.log_file = log_file
+        self.echo = echo  # Mirror each event to stdout for human monitoring
+        # Guards the writer and its queue; held for every put so close()'s
+        # stop marker is always the last item the old writer sees
         self.lock = threading.Lock()
+        self._queue = None
+        self._writer = None
+        # Epoch second and its formatted "YYYY-MM-DDTHH:MM:SS", reused within a second
+        self._cached_second = None
+        self._cached_prefix = ""
+
+    def _format_timestamp(self, now: float) -> str:
+        """Format an epoch time as UTC ISO 8601, reformatting at most once per second.
+
+        Only the writer thread calls this; close() joins the old writer before
+        a new one can start, so the cache is never shared between threads.
+        """
+        second = int(now)
+        if second != self._cached_second:
+            self._cached_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._cached_second = second
+        return f"{self._cached_prefix}.{int((now - second) * 1_000_000):06d}+00:00"
 
     def set_log_file(self, log_file: str):
         """Update the log file path (e.g., after session directory is created)."""
@@ -90,8 +137,8 @@ class ProvenanceLogger:
 
     def log_event(self, actor: str, action: str, details: Dict[str, Any] = None, message: str = None):
         """Log a single event with timestamp and full context."""
+        now = time.time()
         entry = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
             "actor": actor,
             "action": action
         }
@@ -101,28 +148,110 @@ class ProvenanceLogger:
         if message:
             entry["message"] = message
 
+        # Encode now (details may be mutated later); the writer thread adds
+        # the formatted timestamp as the first field
+        item = (self.log_file, now, json_codec.dumps(entry))
+        with self.lock:
+            self._ensure_writer()
+            self._queue.put(item)
+
+        # Also print for human monitoring; one write per line keeps
+        # concurrent agents' lines from interleaving
+        if self.echo:
+            text = message or action
+            if text:
+                sys.stdout.write(f"[{actor}] {text}\n")
+
+    def flush(self):
+        """Block until every event logged so far has been written to disk."""
         with self.lock:
-            with open(self.log_file, "a") as f:
-                f.write(json.dumps(entry) + "\n")
+            writer = self._writer
+            if writer is None or not writer.is_alive():
+                return
+            done = threading.Event()
+            self._queue.put(done)
+        done.wait()
 
-        # Also print for human monitoring
-        if message:
-            print(f"[{actor}] {message}")
-        elif action:
-            print(f"[{actor}] {action}")
+    def close(self):
+        """Write every pending event, then stop the writer thread.
+
+        Logging again afterwards starts a new writer.
+        """
+        with self.lock:
+            writer, self._writer = self._writer, None
+            if writer is None:
+                return
+            self._queue.put(self._STOP)
+            atexit.unregister(self.flush)
+            # Join under the lock so at most one writer runs at a time; the
+            # writer never takes the lock, and loggers just wait briefly
+            writer.join()
+
+    def _ensure_writer(self):
+        """Start a writer thread with its own queue if none is running.
+
+        Call with self.lock held.
+        """
+        if self._writer is None:
+            self._queue = queue.SimpleQueue()
+            self._writer = threading.Thread(
+                target=self._write_loop, args=(self._queue,),
+                name="provenance-writer", daemon=True
+            )
+            self._writer.start()
+            atexit.register(self.flush)
+
+    def _write_loop(self, events: queue.SimpleQueue):
+        """Drain events until close(), writing each batch of lines together."""
+        stopping = False
+        while not stopping:
+            batch = [events.get()]
+            while True:
+                try:
+                    batch.append(events.get_nowait())
+                except queue.Empty:
+                    break
+
+            waiters = [item for item in batch if isinstance(item, threading.Event)]
+            stopping = any(item is self._STOP for item in batch)
+            try:
+                lines_by_file = {}
+                for item in batch:
+                    if item is self._STOP or isinstance(item, threading.Event):
+                        continue
+                    log_file, now, body = item
+                    timestamp = self._format_timestamp(now).encode()
+                    line = b'{"timestamp":"' + timestamp + b'",' + body[1:] + b"\n"
+                    lines_by_file.setdefault(log_file, []).append(line)
+
+                for log_file, lines in lines_by_file.items():
+                    try:
+                        with open(log_file, "ab") as f:
+                            f.write(b"".join(lines))
+                    except OSError as e:
+                        print(f"[logger] Failed to write {log_file}: {e}", file=sys.stderr)
+            except Exception as e:
+                # Keep the writer alive; losing one batch beats hanging flush()
+                print(f"[logger] Failed to write {len(batch)} queued items: {e!r}", file=sys.stderr)
+            finally:
+                # Always release flush() callers, even if the batch failed
+                for done in waiters:
+                    done.set()
 
 
 class SportsPoetryOrchestrator:
     """Main orchestrator for the multi-agent poetry workflow."""
 
-    def __init__(self, config_path: str = "config.json", retry_enabled: bool = True):
+    def __init__(self, config_path: str = "config.json", retry_enabled: bool = True,
+                 quiet: bool = False):
         self.config_path = config_path
         self.retry_enabled = retry_enabled
-        self.logger = ProvenanceLogger()
+        self.logger = ProvenanceLogger(echo=not quiet)
         self.session_start = time.time()
         self.agent_results = []
         self.errors = []
         self.session_dir = None  # Will be set after reading config
+        self.config = None  # Parsed config, shared with in-process agents
         self.session_id = None  # Will be set during run()
 
     def read_config(self) -> Dict[str, Any]:
@@ -130,8 +259,8 @@ class SportsPoetryOrchestrator:
         self.logger.log_event("orchestrator", "read_config", message="Reading configuration file")
 
         try:
-            with open(self.config_path, "r") as f:
-                config = json.load(f)
+            with open(self.config_path, "rb") as f:
+                config = json_codec.loads(f.read())
 
             sports = config.get("sports", [])
             session_id = config.get("session_id", "unknown")
@@ -177,11 +306,16 @@ class SportsPoetryOrchestrator:
 
         session_dir.mkdir(parents=True, exist_ok=True)
 
-        # Create/update symlink to latest
+        # Create/update symlink to latest: build it under a per-session temp
+        # name, then rename over the old link so "latest" never disappears
         latest_link = output_base / "latest"
-        if latest_link.exists() or latest_link.is_symlink():
-            latest_link.unlink()
-        latest_link.symlink_to(session_id)
+        tmp_link = output_base / f".latest.{session_id}.tmp"
+        tmp_link.symlink_to(session_id)
+        try:
+            os.replace(tmp_link, latest_link)
+        except OSError:
+            tmp_link.unlink()
+            raise
 
         self.logger.log_event(
             "orchestrator",
@@ -205,95 +339,43 @@ class SportsPoetryOrchestrator:
         )
 
         try:
-            # Launch the poetry agent as a subprocess
-            result = subprocess.run(
-                [sys.executable, "poetry_agent.py", sport, str(self.session_dir), self.config_path],
-                capture_output=True,
-                text=True,
-                timeout=120  # 2 minute timeout
+            # Run the agent in this worker thread; no interpreter startup per sport
+            metadata = poetry_agent.run_agent(
+                sport, str(self.session_dir), self.config_path, config=self.config,
+                echo=self.logger.echo
             )
 
             duration = time.time() - start_time
+            duration_s = round(duration, 2)
 
-            if result.returncode == 0:
-                # Parse agent output to get metadata
-                output_dir = self.session_dir / sport
-                metadata_file = output_dir / "metadata.json"
-
-                metadata = {}
-                if metadata_file.exists():
-                    with open(metadata_file, "r") as f:
-                        metadata = json.load(f)
-
-                self.logger.log_event(
-                    agent_name,
-                    "complete",
-                    details={
-                        "duration_s": round(duration, 2),
-                        "haiku_lines": metadata.get("haiku_lines", 0),
-                        "sonnet_lines": metadata.get("sonnet_lines", 0)
-                    },
-                    message=f"Completed in {duration:.1f}s"
-                )
-
-                return {
-                    "sport": sport,
-                    "status": "success",
-                    "duration_s": round(duration, 2),
-                    "haiku_lines": metadata.get("haiku_lines", 0),
-                    "sonnet_lines": metadata.get("sonnet_lines", 0),
-                    "haiku_words": metadata.get("haiku_words", 0),
-                    "sonnet_words": metadata.get("sonnet_words", 0)
-                }
-            else:
-                error_msg = result.stderr.strip() if result.stderr else "Unknown error"
-                self.logger.log_event(
-                    agent_name,
-                    "failed",
-                    details={"error": error_msg, "return_code": result.returncode},
-                    message=f"Failed: {error_msg}"
-                )
-
-                return {
-                    "sport": sport,
-                    "status": "failed",
-                    "error": error_msg,
-                    "duration_s": round(duration, 2)
-                }
-
-        except subprocess.TimeoutExpired:
-            duration = time.time() - start_time
-            error_msg = f"Agent timed out after {duration:.0f}s"
             self.logger.log_event(
                 agent_name,
-                "timeout",
-                details={"duration_s": round(duration, 2)},
-                message=error_msg
+                "complete",
+                details={
+                    "duration_s": duration_s,
+                    "haiku_lines": metadata.get("haiku_lines", 0),
+                    "sonnet_lines": metadata.get("sonnet_lines", 0)
+                },
+                message=f"Completed in {duration:.1f}s"
             )
 
-            return {
-                "sport": sport,
-                "status": "failed",
-                "error": error_msg,
-                "duration_s": round(duration, 2)
-            }
+            return agent_result(
+                sport, "success",
+                duration_s=duration_s,
+                **{key: metadata.get(key, 0) for key in AGENT_METRIC_KEYS}
+            )
 
         except Exception as e:
             duration = time.time() - start_time
-            error_msg = str(e)
+            error_msg = str(e) or type(e).__name__
             self.logger.log_event(
                 agent_name,
-                "error",
+                "failed",
                 details={"error": error_msg},
-                message=f"Unexpected error: {error_msg}"
+                message=f"Failed: {error_msg}"
             )
 
-            return {
-                "sport": sport,
-                "status": "failed",
-                "error": error_msg,
-                "duration_s": round(duration, 2)
-            }
+            return agent_result(sport, "failed", error=error_msg, duration_s=round(duration, 2))
 
     def launch_poetry_agent_with_retry(self, sport: str) -> Dict[str, Any]:
         """Launch agent with optional retry on failure."""
@@ -301,12 +383,19 @@ class SportsPoetryOrchestrator:
 
         # Retry if enabled and first attempt failed
         if result["status"] == "failed" and self.retry_enabled:
+            # Back off only for LLM calls (rate limits, transient 5xx);
+            # a template failure would not be cured by waiting
+            delay_s = 0.0
+            if (self.config or {}).get("generation_mode") == "llm":
+                delay_s = round(RETRY_BACKOFF_S * random.uniform(0.5, 1.5), 2)
             self.logger.log_event(
                 "orchestrator",
                 "retry_agent",
-                details={"sport": sport},
+                details={"sport": sport, "delay_s": delay_s},
                 message=f"Retrying {sport} agent"
             )
+            if delay_s:
+                time.sleep(delay_s)
             result = self.launch_poetry_agent(sport, attempt=2)
 
         return result
@@ -320,6 +409,9 @@ class SportsPoetryOrchestrator:
             message=f"Launching {len(sports)} agents in parallel"
         )
 
+        # Deferred import: only needed once a run actually launches agents
+        import concurrent.futures
+
         # Use ThreadPoolExecutor for parallel execution
         with concurrent.futures.ThreadPoolExecutor(max_workers=len(sports)) as executor:
             # Submit all tasks
@@ -342,15 +434,16 @@ class SportsPoetryOrchestrator:
                         details={"sport": sport, "error": str(e)},
                         message=f"Exception in {sport} agent: {e}"
                     )
-                    results.append({
-                        "sport": sport,
-                        "status": "failed",
-                        "error": str(e)
-                    })
+                    results.append(agent_result(sport, "failed", error=str(e)))
 
-        # Log summary
-        succeeded = sum(1 for r in results if r["status"] == "success")
-        failed = sum(1 for r in results if r["status"] == "failed")
+        # Log summary, counting outcomes in one pass
+        succeeded = failed = 0
+        for r in results:
+            status = r["status"]
+            if status == "success":
+                succeeded += 1
+            elif status == "failed":
+                failed += 1
 
         self.logger.log_event(
             "orchestrator",
@@ -373,29 +466,34 @@ class SportsPoetryOrchestrator:
             message="Launching analyzer agent"
         )
 
+        import subprocess  # Deferred: only the analyzer launch needs it
+
         start_time = time.time()
 
         try:
             result = subprocess.run(
-                [sys.executable, "analyzer_agent.py", str(self.session_dir)],
-                capture_output=True,
+                [sys.executable, str(ANALYZER_SCRIPT), str(self.session_dir)],
+                # The report goes to analysis_report.md; only stderr is needed
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True,
                 timeout=120
             )
 
             duration = time.time() - start_time
+            duration_s = round(duration, 2)
 
             if result.returncode == 0:
                 self.logger.log_event(
                     "analyzer",
                     "complete",
-                    details={"duration_s": round(duration, 2)},
+                    details={"duration_s": duration_s},
                     message=f"Analysis complete in {duration:.1f}s"
                 )
 
                 return {
                     "status": "success",
-                    "duration_s": round(duration, 2)
+                    "duration_s": duration_s
                 }
             else:
                 error_msg = result.stderr.strip() if result.stderr else "Unknown error"
@@ -409,7 +507,7 @@ class SportsPoetryOrchestrator:
                 return {
                     "status": "failed",
                     "error": error_msg,
-                    "duration_s": round(duration, 2)
+                    "duration_s": duration_s
                 }
 
         except Exception as e:
@@ -432,9 +530,20 @@ class SportsPoetryOrchestrator:
                        analyzer_result: Dict[str, Any]):
         """Write aggregate usage log entry."""
         total_duration = time.time() - self.session_start
-
-        # Collect all errors
-        errors = [r.get("error") for r in agent_results if r.get("error")]
+        total_duration_s = round(total_duration, 2)
+
+        # Count outcomes and collect errors in one pass
+        succeeded = failed = 0
+        errors = []
+        for r in agent_results:
+            status = r["status"]
+            if status == "success":
+                succeeded += 1
+            elif status == "failed":
+                failed += 1
+            error = r.get("error")
+            if error:
+                errors.append(error)
         if analyzer_result.get("error"):
             errors.append(analyzer_result["error"])
 
@@ -448,23 +557,23 @@ class SportsPoetryOrchestrator:
             "sports_count": len(config.get("sports", [])),
             "validation": "pass",  # Assuming config is valid if we got here
             "agents_launched": len(agent_results),
-            "agents_succeeded": sum(1 for r in agent_results if r["status"] == "success"),
-            "agents_failed": sum(1 for r in agent_results if r["status"] == "failed"),
+            "agents_succeeded": succeeded,
+            "agents_failed": failed,
             "agent_results": agent_results,
             "analyzer_duration_s": analyzer_result.get("duration_s", 0),
-            "total_duration_s": round(total_duration, 2),
+            "total_duration_s": total_duration_s,
             "errors": errors,
             "retry_count": retry_count
         }
 
         usage_log_path = self.session_dir / "usage_log.jsonl"
-        with open(usage_log_path, "a") as f:
-            f.write(json.dumps(usage_entry) + "\n")
+        with open(usage_log_path, "ab") as f:
+            f.write(json_codec.dumps(usage_entry) + b"\n")
 
         self.logger.log_event(
             "orchestrator",
             "usage_log_written",
-            details={"total_duration_s": round(total_duration, 2)},
+            details={"total_duration_s": total_duration_s},
             message=f"Usage log written. Total workflow time: {total_duration:.1f}s"
         )
 
@@ -479,6 +588,7 @@ class SportsPoetryOrchestrator:
         try:
             # Phase 1: Read config
             config = self.read_config()
+            self.config = config
             sports = config.get("sports", [])
 
             if not sports:
@@ -515,11 +625,11 @@ class SportsPoetryOrchestrator:
             # Move early logs from root to session directory
             root_log = Path("execution_log.jsonl")
             session_log = self.session_dir / "execution_log.jsonl"
+            self.logger.flush()
             if root_log.exists():
                 # Copy early logs to session directory
-                with open(root_log, "r") as src:
-                    with open(session_log, "a") as dst:
-                        dst.write(src.read())
+                with open(root_log, "rb") as src, open(session_log, "ab") as dst:
+                    shutil.copyfileobj(src, dst, 64 * 1024)
                 # Remove root log file
                 root_log.unlink()
 
@@ -530,7 +640,8 @@ class SportsPoetryOrchestrator:
             agent_results = self.launch_all_agents(sports)
             self.agent_results = agent_results
 
-            # Phase 3: Launch analyzer
+            # Phase 3: Launch analyzer (it reads execution_log.jsonl)
+            self.logger.flush()
             analyzer_result = self.launch_analyzer()
 
             # Phase 4: Write usage log
@@ -553,8 +664,13 @@ class SportsPoetryOrchestrator:
             )
             return 1
 
+        finally:
+            self.logger.close()
+
 
 if __name__ == "__main__":
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Sports Poetry Multi-Agent Orchestrator",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -563,6 +679,7 @@ Examples:
   python3 orchestrator.py --config output/configs/config_20251103_184500.json
   python3 orchestrator.py --config config.json
   python3 orchestrator.py  # Uses config.json if it exists
+  python3 orchestrator.py --config config.json --quiet
         """
     )
     parser.add_argument(
@@ -572,8 +689,14 @@ Examples:
         help="Path to configuration file. Use timestamped configs from output/configs/ when created by skill (default: config.json)"
     )
 
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Do not echo provenance events or agent progress to stdout (events are still written to execution_log.jsonl)"
+    )
+
     args = parser.parse_args()
 
-    orchestrator = SportsPoetryOrchestrator(config_path=args.config)
+    orchestrator = SportsPoetryOrchestrator(config_path=args.config, quiet=args.quiet)
     exit_code = orchestrator.run()
     sys.exit(exit_code)
@@ -8,11 +8,18 @@ For this demo, we use template-based generation.
 """
 
 import sys
-import json
+import functools
 import time
 from pathlib import Path
 from datetime import datetime, timezone
 
+import json_codec
+
+
+# Per-request timeout for LLM API calls (seconds). Agents run inside the
+# orchestrator process, so this is what bounds a hung provider call.
+LLM_TIMEOUT_S = 120
+
 
 # Simple template-based poem generation for demo purposes
 # In production, replace with actual LLM API calls
@@ -123,8 +130,9 @@ SONNET_TEMPLATES = {
 }
 
 
-def generate_haiku_together(sport: str, model: str, api_token: str) -> list:
-    """Generate a haiku using Together.ai API."""
+@functools.lru_cache(maxsize=4)
+def _together_client(api_token: str):
+    """Return a shared Together client per token so connections are reused."""
     try:
         from together import Together
     except ImportError:
@@ -133,7 +141,53 @@ def generate_haiku_together(sport: str, model: str, api_token: str) -> list:
             "Install it with: pip install -r requirements.txt"
         )
 
-    client = Together(api_key=api_token)
+    return Together(api_key=api_token, timeout=LLM_TIMEOUT_S)
+
+
+@functools.lru_cache(maxsize=4)
+def _hf_client(api_token: str):
+    """Return a shared HuggingFace client per token so connections are reused."""
+    try:
+        from huggingface_hub import InferenceClient
+    except ImportError:
+        raise ImportError(
+            "huggingface-hub is required for LLM mode. "
+            "Install it with: pip install -r requirements.txt"
+        )
+
+    return InferenceClient(token=api_token, timeout=LLM_TIMEOUT_S)
+
+
+def collect_lines(pieces, limit: int = None) -> list:
+    """
+    Split streamed text into stripped, non-empty lines.
+
+    Stops consuming pieces as soon as `limit` lines are complete, so the
+    caller can abandon the rest of a streamed completion.
+    """
+    lines = []
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+        *complete, buffer = buffer.split("\n")
+        lines.extend(line.strip() for line in complete if line.strip())
+        if limit is not None and len(lines) >= limit:
+            return lines[:limit]
+    if buffer.strip():
+        lines.append(buffer.strip())
+    return lines[:limit] if limit is not None else lines
+
+
+def _close_stream(stream) -> None:
+    """Release a streamed response early, if the client supports it."""
+    close = getattr(stream, "close", None)
+    if close is not None:
+        close()
+
+
+def generate_haiku_together(sport: str, model: str, api_token: str) -> list:
+    """Generate a haiku using Together.ai API."""
+    client = _together_client(api_token)
 
     prompt = f"""Write a haiku about {sport}.
 Follow the traditional 5-7-5 syllable structure.
@@ -141,33 +195,26 @@ Capture the essence and excitement of the sport.
 Return only the haiku, no other text."""
 
     try:
-        response = client.chat.completions.create(
+        stream = client.chat.completions.create(
             model=model,
             messages=[{"role": "user", "content": prompt}],
             max_tokens=100,
-            temperature=0.7
+            temperature=0.7,
+            stream=True
         )
-        # Extract text from response
-        text = response.choices[0].message.content
-        # Parse response into lines
-        lines = [line.strip() for line in text.strip().split('\n') if line.strip()]
-        # Return first 3 non-empty lines
-        return lines[:3] if len(lines) >= 3 else lines
+        # Return the first 3 non-empty lines, closing the stream once they arrive
+        pieces = (chunk.choices[0].delta.content or "" for chunk in stream if chunk.choices)
+        try:
+            return collect_lines(pieces, limit=3)
+        finally:
+            _close_stream(stream)
     except Exception as e:
         raise RuntimeError(f"Together.ai API error: {e}")
 
 
 def generate_sonnet_together(sport: str, model: str, api_token: str) -> list:
     """Generate a sonnet using Together.ai API."""
-    try:
-        from together import Together
-    except ImportError:
-        raise ImportError(
-            "together is required for Together.ai. "
-            "Install it with: pip install -r requirements.txt"
-        )
-
-    client = Together(api_key=api_token)
+    client = _together_client(api_token)
 
     prompt = f"""Write a 14-line sonnet about {sport}.
 Use iambic pentameter if possible.
@@ -192,15 +239,7 @@ Return only the sonnet, no other text."""
 
 def generate_haiku_llm(sport: str, model: str, api_token: str) -> list:
     """Generate a haiku using HuggingFace Inference API."""
-    try:
-        from huggingface_hub import InferenceClient
-    except ImportError:
-        raise ImportError(
-            "huggingface-hub is required for LLM mode. "
-            "Install it with: pip install -r requirements.txt"
-        )
-
-    client = InferenceClient(token=api_token)
+    client = _hf_client(api_token)
 
     prompt = f"""Write a haiku about {sport}.
 Follow the traditional 5-7-5 syllable structure.
@@ -208,31 +247,25 @@ Capture the essence and excitement of the sport.
 Return only the haiku, no other text."""
 
     try:
-        response = client.text_generation(
+        stream = client.text_generation(
             prompt,
             model=model,
             max_new_tokens=100,
-            temperature=0.7
+            temperature=0.7,
+            stream=True
         )
-        # Parse response into lines
-        lines = [line.strip() for line in response.strip().split('\n') if line.strip()]
-        # Return first 3 non-empty lines
-        return lines[:3] if len(lines) >= 3 else lines
+        # Return the first 3 non-empty lines, closing the stream once they arrive
+        try:
+            return collect_lines(stream, limit=3)
+        finally:
+            _close_stream(stream)
     except Exception as e:
         raise RuntimeError(f"HuggingFace API error: {e}")
 
 
 def generate_sonnet_llm(sport: str, model: str, api_token: str) -> list:
     """Generate a sonnet using HuggingFace Inference API."""
-    try:
-        from huggingface_hub import InferenceClient
-    except ImportError:
-        raise ImportError(
-            "huggingface-hub is required for LLM mode. "
-            "Install it with: pip install -r requirements.txt"
-        )
-
-    client = InferenceClient(token=api_token)
+    client = _hf_client(api_token)
 
     prompt = f"""Write a 14-line sonnet about {sport}.
 Use iambic pentameter if possible.
@@ -304,26 +337,93 @@ def count_words(lines: list) -> int:
     return sum(len(line.split()) for line in lines)
 
 
-def main():
-    import os
+def render_poem(lines: list) -> tuple:
+    """Return (UTF-8 file contents, line count, word count) for a poem."""
+    text = "\n".join(lines) + "\n"
+    # Whitespace split of the joined text counts the same words as count_words
+    return text.encode("utf-8"), len(lines), len(text.split())
 
-    if len(sys.argv) < 2:
-        print("Error: Sport name required", file=sys.stderr)
-        sys.exit(1)
 
-    sport = sys.argv[1]
-    session_dir = sys.argv[2] if len(sys.argv) > 2 else "output"  # Default for backward compat
-    config_path = sys.argv[3] if len(sys.argv) > 3 else "config.json"  # Config file path
+# Templates never change, so render them once at import
+_HAIKU_RENDERED = {k: render_poem(v) for k, v in HAIKU_TEMPLATES.items()}
+_SONNET_RENDERED = {k: render_poem(v) for k, v in SONNET_TEMPLATES.items()}
 
-    start_time = time.time()
 
-    # Load config
+def _progress(sport: str, text: str) -> None:
+    """Print an agent progress line with a single write so concurrent agents don't interleave."""
+    sys.stdout.write(f"Agent {sport}: {text}\n")
+
+
+def generate_llm_poems(sport: str, llm_model: str, api_token: str,
+                       llm_provider: str) -> tuple:
+    """
+    Generate the haiku and sonnet with overlapping LLM requests.
+
+    The two prompts are independent, so the sonnet request runs on a helper
+    thread while the haiku request runs on this one, paying roughly one
+    network round-trip instead of two.
+
+    Returns:
+        (haiku_lines, sonnet_lines)
+
+    Raises:
+        RuntimeError: If either poem fails to generate
+    """
+    import concurrent.futures
+
+    # No context manager: on a haiku failure the error is raised at once
+    # instead of waiting for the sonnet request to finish
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    sonnet_future = executor.submit(
+        generate_sonnet, sport, "llm", llm_model, api_token, llm_provider
+    )
     try:
-        with open(config_path, "r") as f:
-            config = json.load(f)
+        haiku_lines = generate_haiku(sport, "llm", llm_model, api_token, llm_provider)
     except Exception as e:
-        print(f"Error: Could not load config: {e}", file=sys.stderr)
-        sys.exit(1)
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise RuntimeError(f"Failed to generate haiku: {e}") from e
+    try:
+        sonnet_lines = sonnet_future.result()
+    except Exception as e:
+        raise RuntimeError(f"Failed to generate sonnet: {e}") from e
+    finally:
+        executor.shutdown(wait=False)
+
+    return haiku_lines, sonnet_lines
+
+
+def run_agent(sport: str, session_dir: str = "output", config_path: str = "config.json",
+              config: dict = None, echo: bool = True) -> dict:
+    """
+    Generate the haiku and sonnet for one sport and write them to disk.
+
+    Writes haiku.txt, sonnet.txt, and metadata.json under session_dir/sport.
+
+    Args:
+        sport: Sport to write about
+        session_dir: Session output directory
+        config_path: Path to the run's config file (read only if config is None)
+        config: Already-parsed config, e.g. from the orchestrator
+        echo: Print progress lines to stdout (False for a quiet orchestrator run)
+
+    Returns:
+        The metadata dict that was written to metadata.json
+
+    Raises:
+        RuntimeError: If the config cannot be read or generation fails
+    """
+    import os
+
+    # Wall clock for the recorded timestamps, monotonic clock for the duration
+    start_time = time.time()
+    start_mono = time.monotonic()
+
+    # Load config unless the caller already parsed it
+    if config is None:
+        try:
+            config = json_codec.loads(Path(config_path).read_bytes())
+        except Exception as e:
+            raise RuntimeError(f"Could not load config: {e}") from e
 
     # Get generation settings
     generation_mode = config.get("generation_mode", "template")
@@ -337,64 +437,70 @@ def main():
     else:
         api_token = os.environ.get("HUGGINGFACE_API_TOKEN")
 
-    print(f"Agent {sport}: Starting poetry generation (mode: {generation_mode}, provider: {llm_provider})")
-
-    # Create output directory within session
-    output_dir = Path(session_dir) / sport
-    output_dir.mkdir(parents=True, exist_ok=True)
+    progress = _progress if echo else lambda sport, text: None
 
-    # Generate haiku
-    try:
-        haiku_lines = generate_haiku(sport, generation_mode, llm_model, api_token, llm_provider)
-    except Exception as e:
-        print(f"Error generating haiku: {e}", file=sys.stderr)
-        sys.exit(1)
+    progress(sport, f"Starting poetry generation (mode: {generation_mode}, provider: {llm_provider})")
 
-    haiku_text = "\n".join(haiku_lines)
-
-    # Write haiku
-    haiku_file = output_dir / "haiku.txt"
-    with open(haiku_file, "w") as f:
-        f.write(haiku_text + "\n")
-
-    print(f"Agent {sport}: Wrote haiku ({len(haiku_lines)} lines)")
-
-    # Generate sonnet
-    try:
-        sonnet_lines = generate_sonnet(sport, generation_mode, llm_model, api_token, llm_provider)
-    except Exception as e:
-        print(f"Error generating sonnet: {e}", file=sys.stderr)
-        sys.exit(1)
-
-    sonnet_text = "\n".join(sonnet_lines)
-
-    # Write sonnet
-    sonnet_file = output_dir / "sonnet.txt"
-    with open(sonnet_file, "w") as f:
-        f.write(sonnet_text + "\n")
-
-    print(f"Agent {sport}: Wrote sonnet ({len(sonnet_lines)} lines)")
+    if generation_mode == "llm":
+        haiku_lines, sonnet_lines = generate_llm_poems(sport, llm_model, api_token, llm_provider)
+        haiku_bytes, haiku_line_count, haiku_words = render_poem(haiku_lines)
+        sonnet_bytes, sonnet_line_count, sonnet_words = render_poem(sonnet_lines)
+    else:
+        # Templates are keyed by lower-case sport name
+        template_key = sport.lower()
+        haiku_bytes, haiku_line_count, haiku_words = _HAIKU_RENDERED.get(
+            template_key, _HAIKU_RENDERED["default"])
+        sonnet_bytes, sonnet_line_count, sonnet_words = _SONNET_RENDERED.get(
+            template_key, _SONNET_RENDERED["default"])
 
     # Create metadata
     end_time = time.time()
+    duration = time.monotonic() - start_mono
     metadata = {
         "sport": sport,
         "generation_mode": generation_mode,
         "llm_model": llm_model if generation_mode == "llm" else None,
-        "timestamp_start": datetime.now(timezone.utc).isoformat(),
-        "timestamp_end": datetime.now(timezone.utc).isoformat(),
-        "duration_s": round(end_time - start_time, 2),
-        "haiku_lines": len(haiku_lines),
-        "haiku_words": count_words(haiku_lines),
-        "sonnet_lines": len(sonnet_lines),
-        "sonnet_words": count_words(sonnet_lines)
+        "timestamp_start": datetime.fromtimestamp(start_time, timezone.utc).isoformat(),
+        "timestamp_end": datetime.fromtimestamp(end_time, timezone.utc).isoformat(),
+        "duration_s": round(duration, 2),
+        "haiku_lines": haiku_line_count,
+        "haiku_words": haiku_words,
+        "sonnet_lines": sonnet_line_count,
+        "sonnet_words": sonnet_words
     }
 
-    metadata_file = output_dir / "metadata.json"
-    with open(metadata_file, "w") as f:
-        json.dump(metadata, f, indent=2)
+    # Write all outputs together once both poems exist, so a failed
+    # generation never leaves a partial sport directory behind
+    output_dir = Path(session_dir) / sport
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    (output_dir / "haiku.txt").write_bytes(haiku_bytes)
+    progress(sport, f"Wrote haiku ({haiku_line_count} lines)")
+
+    (output_dir / "sonnet.txt").write_bytes(sonnet_bytes)
+    progress(sport, f"Wrote sonnet ({sonnet_line_count} lines)")
 
-    print(f"Agent {sport}: Complete")
+    (output_dir / "metadata.json").write_bytes(json_codec.dumps_pretty(metadata))
+
+    progress(sport, "Complete")
+
+    return metadata
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Error: Sport name required", file=sys.stderr)
+        sys.exit(1)
+
+    sport = sys.argv[1]
+    session_dir = sys.argv[2] if len(sys.argv) > 2 else "output"  # Default for backward compat
+    config_path = sys.argv[3] if len(sys.argv) > 3 else "config.json"  # Config file path
+
+    try:
+        run_agent(sport, session_dir, config_path)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
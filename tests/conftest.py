@@ -43,6 +43,19 @@ def api_key():
     return key
 
 
+@pytest.fixture
+def sports():
+    """Provide a valid three-sport list (a fresh copy per test)."""
+    return ["basketball", "soccer", "tennis"]
+
+
+@pytest.fixture
+def builder():
+    """Provide a fresh ConfigBuilder with default settings."""
+    from config_builder import ConfigBuilder
+    return ConfigBuilder()
+
+
 @pytest.fixture
 def sample_config():
     """Provide a sample config dict for testing."""
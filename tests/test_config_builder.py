@@ -2,131 +2,139 @@
 
 import pytest
 import json
+import os
 from pathlib import Path
 from config_builder import ConfigBuilder, ConfigValidationError, compute_changes_from_default
 
 
+# Serialized once at import; tests only need to write these bytes out
+_LOADED_CONFIG_BYTES = json.dumps({
+    "sports": ["hockey", "volleyball", "swimming"],
+    "session_id": "loaded_session",
+    "timestamp": "2025-01-01T12:00:00Z",
+    "retry_enabled": True,
+    "generation_mode": "template",
+    "llm_provider": "together",
+    "llm_model": "meta-llama/Llama-3.3-70B-Instruct-Turbo-Free"
+}).encode()
+
+_DEFAULT_CONFIG_BYTES = json.dumps({
+    "sports": ["basketball", "soccer", "tennis"],
+    "retry_enabled": True,
+    "generation_mode": "template"
+}).encode()
+
+
+_EXPECTED_DEFAULTS = {
+    "sports": [],
+    "retry_enabled": True,
+    "generation_mode": "template"
+}
+
+
+@pytest.fixture
+def default_config_file(tmp_path):
+    """Write the standard template-mode default config for one test."""
+    path = tmp_path / "config.default.json"
+    path.write_bytes(_DEFAULT_CONFIG_BYTES)
+    return path
+
+
+@pytest.fixture
+def cfg_path(tmp_path):
+    """Path for a per-test config file."""
+    return tmp_path / "test_config.json"
+
+
 class TestConfigBuilder:
     """Tests for ConfigBuilder class."""
 
-    def test_default_config(self):
-        """Test that default config has expected values."""
-        builder = ConfigBuilder()
-        assert builder.config["sports"] == []
-        assert builder.config["retry_enabled"] is True
-        assert builder.config["generation_mode"] == "template"
-        assert "llm" not in builder.config  # No LLM config in template mode
+    def test_default_config(self, builder):
+        """Test that default config has exactly the expected values."""
+        # Exact match also checks there is no LLM config in template mode
+        assert builder.config == _EXPECTED_DEFAULTS
 
-    def test_with_sports_valid(self):
+    def test_with_sports_valid(self, builder, sports):
         """Test adding valid sports list."""
-        builder = ConfigBuilder()
-        builder.with_sports(["basketball", "soccer", "tennis"])
+        builder.with_sports(sports)
         assert builder.config["sports"] == ["basketball", "soccer", "tennis"]
 
-    def test_with_sports_normalizes_case(self):
+    def test_with_sports_normalizes_case(self, builder):
         """Test that sports names are normalized to lowercase."""
-        builder = ConfigBuilder()
         builder.with_sports(["BASKETBALL", "Soccer", "TenNis"])
         assert builder.config["sports"] == ["basketball", "soccer", "tennis"]
 
-    def test_with_sports_strips_whitespace(self):
+    def test_with_sports_strips_whitespace(self, builder):
         """Test that whitespace is stripped from sport names."""
-        builder = ConfigBuilder()
         builder.with_sports([" basketball ", "  soccer", "tennis  "])
         assert builder.config["sports"] == ["basketball", "soccer", "tennis"]
 
-    def test_with_sports_too_few(self):
-        """Test that fewer than 3 sports raises error."""
-        builder = ConfigBuilder()
-        with pytest.raises(ConfigValidationError, match="at least 3 sports"):
-            builder.with_sports(["basketball", "soccer"])
-
-    def test_with_sports_too_many(self):
-        """Test that more than 5 sports raises error."""
-        builder = ConfigBuilder()
-        with pytest.raises(ConfigValidationError, match="more than 5 sports"):
-            builder.with_sports(["a", "b", "c", "d", "e", "f"])
-
-    def test_with_sports_duplicates(self):
-        """Test that duplicate sports raise error."""
-        builder = ConfigBuilder()
-        with pytest.raises(ConfigValidationError, match="duplicates"):
-            builder.with_sports(["basketball", "soccer", "basketball"])
-
-    def test_with_sports_empty_string(self):
-        """Test that empty sport names raise error."""
-        builder = ConfigBuilder()
-        with pytest.raises(ConfigValidationError, match="empty values"):
-            builder.with_sports(["basketball", "", "tennis"])
-
-    def test_with_sports_not_list(self):
-        """Test that non-list input raises error."""
-        builder = ConfigBuilder()
-        with pytest.raises(ConfigValidationError, match="must be a list"):
-            builder.with_sports("basketball,soccer,tennis")
-
-    def test_with_retry_enabled(self):
+    @pytest.mark.parametrize("invalid_sports,match", [
+        (["basketball", "soccer"], "at least 3 sports"),
+        (["a", "b", "c", "d", "e", "f"], "more than 5 sports"),
+        (["basketball", "soccer", "basketball"], "duplicates"),
+        (["basketball", "", "tennis"], "empty values"),
+        ("basketball,soccer,tennis", "must be a list"),
+    ], ids=["too_few", "too_many", "duplicates", "empty_string", "not_list"])
+    def test_with_sports_invalid(self, builder, invalid_sports, match):
+        """Test that invalid sports lists raise a descriptive error."""
+        with pytest.raises(ConfigValidationError, match=match):
+            builder.with_sports(invalid_sports)
+
+    def test_with_retry_enabled(self, builder):
         """Test enabling retry."""
-        builder = ConfigBuilder()
         builder.with_retry(True)
         assert builder.config["retry_enabled"] is True
 
-    def test_with_retry_disabled(self):
+    def test_with_retry_disabled(self, builder):
         """Test disabling retry."""
-        builder = ConfigBuilder()
         builder.with_retry(False)
         assert builder.config["retry_enabled"] is False
 
-    def test_with_generation_mode_template(self):
+    def test_with_generation_mode_template(self, builder):
         """Test setting template generation mode."""
-        builder = ConfigBuilder()
         builder.with_generation_mode("template")
         assert builder.config["generation_mode"] == "template"
 
-    def test_with_generation_mode_llm(self):
+    def test_with_generation_mode_llm(self, builder):
         """Test setting LLM generation mode."""
-        builder = ConfigBuilder()
         builder.with_generation_mode("llm")
         assert builder.config["generation_mode"] == "llm"
 
-    def test_with_generation_mode_invalid(self):
+    @pytest.mark.parametrize("mode", ["invalid", ""])
+    def test_with_generation_mode_invalid(self, builder, mode):
         """Test that invalid generation mode raises error."""
-        builder = ConfigBuilder()
         with pytest.raises(ConfigValidationError, match="Invalid generation mode"):
-            builder.with_generation_mode("invalid")
+            builder.with_generation_mode(mode)
 
-    def test_with_llm_provider_together(self):
+    def test_with_llm_provider_together(self, builder):
         """Test setting Together.ai provider."""
-        builder = ConfigBuilder()
         builder.with_llm_provider("together")
         assert builder.config["llm"]["provider"] == "together"
         assert builder.config["generation_mode"] == "llm"  # Auto-enabled
 
-    def test_with_llm_provider_huggingface(self):
+    def test_with_llm_provider_huggingface(self, builder):
         """Test setting HuggingFace provider."""
-        builder = ConfigBuilder()
         builder.with_llm_provider("huggingface")
         assert builder.config["llm"]["provider"] == "huggingface"
         assert builder.config["generation_mode"] == "llm"  # Auto-enabled
 
-    def test_with_llm_provider_invalid(self):
+    @pytest.mark.parametrize("provider", ["openai", ""])
+    def test_with_llm_provider_invalid(self, builder, provider):
         """Test that invalid LLM provider raises error."""
-        builder = ConfigBuilder()
         with pytest.raises(ConfigValidationError, match="Invalid LLM provider"):
-            builder.with_llm_provider("openai")
+            builder.with_llm_provider(provider)
 
-    def test_with_llm_model(self):
+    def test_with_llm_model(self, builder):
         """Test setting LLM model."""
-        builder = ConfigBuilder()
         builder.with_llm_model("custom-model-name")
         assert builder.config["llm"]["model"] == "custom-model-name"
         assert builder.config["generation_mode"] == "llm"  # Auto-enabled
 
-    def test_method_chaining(self):
+    def test_method_chaining(self, builder, sports):
         """Test that methods support chaining."""
-        builder = ConfigBuilder()
         result = (builder
-                  .with_sports(["basketball", "soccer", "tennis"])
+                  .with_sports(sports)
                   .with_generation_mode("llm")
                   .with_retry(False))
         assert result is builder
@@ -134,77 +142,69 @@ class TestConfigBuilder:
         assert builder.config["generation_mode"] == "llm"
         assert builder.config["retry_enabled"] is False
 
-    def test_validate_success(self):
+    def test_validate_success(self, builder, sports):
         """Test that valid config passes validation."""
-        builder = ConfigBuilder()
-        builder.with_sports(["basketball", "soccer", "tennis"])
+        builder.with_sports(sports)
         config = builder.validate()
         assert config["sports"] == ["basketball", "soccer", "tennis"]
 
-    def test_validate_missing_sports(self):
+    def test_validate_missing_sports(self, builder):
         """Test that validation fails without sports."""
-        builder = ConfigBuilder()
         with pytest.raises(ConfigValidationError, match="Sports list is required"):
             builder.validate()
 
-    def test_validate_llm_mode_requires_config(self):
+    def test_validate_llm_mode_requires_config(self, builder, sports):
         """Test that LLM mode requires llm configuration object."""
-        builder = ConfigBuilder()
-        builder.with_sports(["basketball", "soccer", "tennis"])
+        builder.with_sports(sports)
         builder.config["generation_mode"] = "llm"  # Set mode without LLM config
         with pytest.raises(ConfigValidationError, match="LLM configuration required"):
             builder.validate()
 
-    def test_validate_llm_mode_requires_provider(self):
+    def test_validate_llm_mode_requires_provider(self, builder, sports):
         """Test that LLM mode requires provider."""
-        builder = ConfigBuilder()
-        builder.with_sports(["basketball", "soccer", "tennis"])
+        builder.with_sports(sports)
         builder.with_generation_mode("llm")
         builder.config["llm"]["provider"] = None  # Manually break it
         with pytest.raises(ConfigValidationError, match="LLM provider is required"):
             builder.validate()
 
-    def test_validate_llm_mode_requires_model(self):
+    def test_validate_llm_mode_requires_model(self, builder, sports):
         """Test that LLM mode requires model."""
-        builder = ConfigBuilder()
-        builder.with_sports(["basketball", "soccer", "tennis"])
+        builder.with_sports(sports)
         builder.with_generation_mode("llm")
         builder.config["llm"]["model"] = None  # Manually break it
         with pytest.raises(ConfigValidationError, match="LLM model is required"):
             builder.validate()
 
-    def test_validate_config(self):
+    def test_validate_config(self, builder, sports):
         """Test that validate validates the configuration."""
-        builder = ConfigBuilder()
-        builder.with_sports(["basketball", "soccer", "tennis"])
+        builder.with_sports(sports)
         config = builder.validate()
-        assert config["sports"] == ["basketball", "soccer", "tennis"]
-        assert config["retry_enabled"] is True
-        assert config["generation_mode"] == "template"
+        assert config == {
+            "sports": ["basketball", "soccer", "tennis"],
+            "retry_enabled": True,
+            "generation_mode": "template"
+        }
 
-    def test_save_creates_file(self, tmp_path, monkeypatch):
+    def test_save_creates_file(self, builder, sports, cfg_path):
         """Test that save creates a config file."""
-        monkeypatch.chdir(tmp_path)
-
-        config_path = tmp_path / "test_config.json"
-        builder = ConfigBuilder()
-        builder.with_sports(["basketball", "soccer", "tennis"])
-        path = builder.save(str(config_path))
+        builder.with_sports(sports)
+        path = builder.save(str(cfg_path))
 
-        assert path.exists()
-        with open(path, "r") as f:
-            data = json.load(f)
-        assert data["sports"] == ["basketball", "soccer", "tennis"]
-        assert data["retry_enabled"] is True
-        assert data["generation_mode"] == "template"
-        assert "llm" not in data  # Template mode shouldn't have LLM config
+        # read_bytes raises FileNotFoundError if save did not create the file
+        data = json.loads(path.read_bytes())
+        # Exact match also checks template mode wrote no LLM config
+        assert data == {
+            "sports": ["basketball", "soccer", "tennis"],
+            "retry_enabled": True,
+            "generation_mode": "template"
+        }
 
-    def test_save_default_path(self, tmp_path, monkeypatch):
+    def test_save_default_path(self, builder, sports, tmp_path, monkeypatch):
         """Test that save uses default path."""
         monkeypatch.chdir(tmp_path)
 
-        builder = ConfigBuilder()
-        builder.with_sports(["basketball", "soccer", "tennis"])
+        builder.with_sports(sports)
         path = builder.save()
 
         assert path.name == "config.json"
@@ -222,47 +222,41 @@ class TestConfigBuilder:
             "llm_model": "test-model"
         }
         builder = ConfigBuilder.from_dict(data)
-        assert builder.config["sports"] == ["basketball", "soccer", "tennis"]
-        assert builder.config["retry_enabled"] is False
-        assert builder.config["generation_mode"] == "llm"
+        # data overrides every default, so the builder holds exactly data
+        assert builder.config == data
 
-    def test_load_existing_config(self, tmp_path):
-        """Test loading existing config file."""
-        config_path = tmp_path / "test_config.json"
+    def test_from_dict_fills_missing_defaults(self):
+        """Test that a partial config keeps builder defaults for missing fields."""
+        builder = ConfigBuilder.from_dict({"sports": ["hockey", "volleyball", "swimming"]})
+        assert builder.config["sports"] == ["hockey", "volleyball", "swimming"]
+        assert builder.config["retry_enabled"] is True
+        assert builder.config["generation_mode"] == "template"
+
+    def test_from_dict_does_not_mutate_input(self):
+        """Test that builder updates never leak back into the source dict."""
         data = {
-            "sports": ["hockey", "volleyball", "swimming"],
-            "session_id": "loaded_session",
-            "timestamp": "2025-01-01T12:00:00Z",
-            "retry_enabled": True,
-            "generation_mode": "template",
-            "llm_provider": "together",
-            "llm_model": "meta-llama/Llama-3.3-70B-Instruct-Turbo-Free"
+            "sports": ["basketball", "soccer", "tennis"],
+            "generation_mode": "llm",
+            "llm": {"provider": "together", "model": "test-model"}
         }
-        with open(config_path, "w") as f:
-            json.dump(data, f)
+        builder = ConfigBuilder.from_dict(data)
+        builder.with_llm_provider("huggingface")
+        builder.with_sports(["hockey", "volleyball", "swimming"])
+
+        assert data["llm"]["provider"] == "together"
+        assert data["sports"] == ["basketball", "soccer", "tennis"]
+
+    def test_load_existing_config(self, cfg_path):
+        """Test loading existing config file."""
+        cfg_path.write_bytes(_LOADED_CONFIG_BYTES)
 
-        builder = ConfigBuilder.load(str(config_path))
+        builder = ConfigBuilder.load(str(cfg_path))
         assert builder.config["sports"] == ["hockey", "volleyball", "swimming"]
         assert builder.config["session_id"] == "loaded_session"
 
-    def test_load_default_exists(self, tmp_path, monkeypatch):
+    def test_load_default_exists(self, default_config_file):
         """Test loading default config successfully."""
-        monkeypatch.chdir(tmp_path)
-        # Create a default config
-        default_config = {
-            "sports": ["basketball", "soccer", "tennis"],
-            "session_id": None,
-            "timestamp": None,
-            "retry_enabled": True,
-            "generation_mode": "template",
-            "llm_provider": "together",
-            "llm_model": "meta-llama/Llama-3.3-70B-Instruct-Turbo-Free"
-        }
-        default_path = tmp_path / "config.default.json"
-        with open(default_path, "w") as f:
-            json.dump(default_config, f)
-
-        builder = ConfigBuilder.load_default(str(default_path))
+        builder = ConfigBuilder.load_default(str(default_config_file))
         assert builder.config["sports"] == ["basketball", "soccer", "tennis"]
         assert builder.config["generation_mode"] == "template"
 
@@ -272,9 +266,38 @@ class TestConfigBuilder:
         with pytest.raises(FileNotFoundError, match="Default config not found"):
             ConfigBuilder.load_default(str(missing_path))
 
-    def test_llm_mode_auto_populates_defaults(self):
+    def test_load_default_returns_independent_copies(self, tmp_path):
+        """Test that mutating a loaded default does not leak into later loads."""
+        default_path = tmp_path / "config.default.json"
+        with open(default_path, "w") as f:
+            json.dump({"sports": ["basketball", "soccer", "tennis"],
+                       "generation_mode": "llm",
+                       "llm": {"provider": "together", "model": "m"}}, f)
+
+        builder1 = ConfigBuilder.load_default(str(default_path))
+        builder1.config["llm"]["provider"] = "huggingface"
+        builder1.config["sports"].append("hockey")
+
+        builder2 = ConfigBuilder.load_default(str(default_path))
+        assert builder2.config["llm"]["provider"] == "together"
+        assert builder2.config["sports"] == ["basketball", "soccer", "tennis"]
+
+    def test_load_default_picks_up_file_changes(self, tmp_path):
+        """Test that load_default re-reads the file after it is modified."""
+        default_path = tmp_path / "config.default.json"
+        with open(default_path, "w") as f:
+            json.dump({"sports": ["basketball", "soccer", "tennis"]}, f)
+        assert ConfigBuilder.load_default(str(default_path)).config["sports"][0] == "basketball"
+
+        with open(default_path, "w") as f:
+            json.dump({"sports": ["hockey", "soccer", "tennis"]}, f)
+        stat = default_path.stat()
+        os.utime(default_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert ConfigBuilder.load_default(str(default_path)).config["sports"][0] == "hockey"
+
+    def test_llm_mode_auto_populates_defaults(self, builder):
         """Test that switching to LLM mode auto-populates LLM config."""
-        builder = ConfigBuilder()
         builder.with_sports(["hockey", "soccer", "tennis"])
         builder.with_generation_mode("llm")
 
@@ -283,9 +306,8 @@ class TestConfigBuilder:
         assert config["llm"]["provider"] == "together"
         assert "Llama" in config["llm"]["model"]
 
-    def test_with_llm_provider_enables_llm_mode(self):
+    def test_with_llm_provider_enables_llm_mode(self, builder):
         """Test that setting LLM provider auto-enables LLM mode."""
-        builder = ConfigBuilder()
         builder.with_sports(["hockey", "soccer", "tennis"])
         builder.with_llm_provider("huggingface")
 
@@ -293,18 +315,16 @@ class TestConfigBuilder:
         assert config["generation_mode"] == "llm"
         assert config["llm"]["provider"] == "huggingface"
 
-    def test_template_mode_no_llm_config(self):
+    def test_template_mode_no_llm_config(self, builder):
         """Test that template mode doesn't have LLM config."""
-        builder = ConfigBuilder()
         builder.with_sports(["hockey", "soccer", "tennis"])
 
         config = builder.validate()
         assert config["generation_mode"] == "template"
         assert "llm" not in config
 
-    def test_with_llm_model_enables_llm_mode(self):
+    def test_with_llm_model_enables_llm_mode(self, builder):
         """Test that setting LLM model auto-enables LLM mode."""
-        builder = ConfigBuilder()
         builder.with_sports(["hockey", "soccer", "tennis"])
         builder.with_llm_model("custom-model")
 
@@ -349,6 +369,21 @@ class TestComputeChangesFromDefault:
         assert changes["generation_mode"]["old"] == "template"
         assert changes["generation_mode"]["new"] == "llm"
 
+    def test_runtime_fields_ignored(self):
+        """Test that session_id and timestamp never count as changes."""
+        default = {
+            "sports": ["basketball", "soccer", "tennis"],
+            "generation_mode": "template"
+        }
+        new = default.copy()
+        new["session_id"] = "session_20251103_184000_a3f9c2"
+        new["timestamp"] = "2025-11-03T18:40:00Z"
+
+        changed, changes = compute_changes_from_default(default, new)
+
+        assert changed == []
+        assert changes == {}
+
     def test_multiple_changes(self):
         """Test when multiple fields change."""
         default = {
@@ -372,80 +407,45 @@ class TestComputeChangesFromDefault:
 class TestConfigBuilderIntegration:
     """Integration tests for typical usage patterns."""
 
-    def test_template_mode_workflow(self, tmp_path, monkeypatch):
+    def test_template_mode_workflow(self, tmp_path, default_config_file):
         """Test complete workflow for template mode config."""
-        monkeypatch.chdir(tmp_path)
-        # Create default config
-        default_config = {
-            "sports": ["basketball", "soccer", "tennis"],
-            "retry_enabled": True,
-            "generation_mode": "template"
-        }
-        default_path = tmp_path / "config.default.json"
-        with open(default_path, "w") as f:
-            json.dump(default_config, f)
-
         config_path = tmp_path / "config.json"
         # Use load_default() pattern (matches documentation)
-        builder = ConfigBuilder.load_default(str(default_path))
+        builder = ConfigBuilder.load_default(str(default_config_file))
         # Using default sports, so no changes needed
         path = builder.save(str(config_path))
 
         # Verify file contents
-        with open(path, "r") as f:
-            config = json.load(f)
+        config = json.loads(path.read_bytes())
 
         assert config["sports"] == ["basketball", "soccer", "tennis"]
         assert config["generation_mode"] == "template"
         assert "llm" not in config  # Template mode has no LLM config
 
-    def test_llm_mode_workflow(self, tmp_path, monkeypatch):
+    def test_llm_mode_workflow(self, tmp_path, default_config_file):
         """Test complete workflow for LLM mode config."""
-        monkeypatch.chdir(tmp_path)
-        # Create default config
-        default_config = {
-            "sports": ["basketball", "soccer", "tennis"],
-            "retry_enabled": True,
-            "generation_mode": "template"
-        }
-        default_path = tmp_path / "config.default.json"
-        with open(default_path, "w") as f:
-            json.dump(default_config, f)
-
         config_path = tmp_path / "config.json"
         # Use load_default() pattern (matches documentation)
-        builder = ConfigBuilder.load_default(str(default_path))
+        builder = ConfigBuilder.load_default(str(default_config_file))
         builder.with_sports(["hockey", "volleyball", "swimming", "baseball"])
         builder.with_generation_mode("llm")
         # LLM defaults are auto-populated
         path = builder.save(str(config_path))
 
         # Verify file contents
-        with open(path, "r") as f:
-            config = json.load(f)
+        config = json.loads(path.read_bytes())
 
         assert config["sports"] == ["hockey", "volleyball", "swimming", "baseball"]
         assert config["generation_mode"] == "llm"
         assert config["llm"]["provider"] == "together"
         assert "Llama" in config["llm"]["model"]
 
-    def test_modify_and_resave(self, tmp_path, monkeypatch):
+    def test_modify_and_resave(self, tmp_path, default_config_file):
         """Test loading, modifying, and resaving config."""
-        monkeypatch.chdir(tmp_path)
-        # Create default config
-        default_config = {
-            "sports": ["basketball", "soccer", "tennis"],
-            "retry_enabled": True,
-            "generation_mode": "template"
-        }
-        default_path = tmp_path / "config.default.json"
-        with open(default_path, "w") as f:
-            json.dump(default_config, f)
-
         config_path = tmp_path / "config.json"
 
         # Create initial config using load_default() pattern
-        builder1 = ConfigBuilder.load_default(str(default_path))
+        builder1 = ConfigBuilder.load_default(str(default_config_file))
         # Using default sports, no changes needed
         builder1.save(str(config_path))
 
@@ -456,8 +456,7 @@ class TestConfigBuilderIntegration:
         builder2.save(str(config_path))
 
         # Verify modifications
-        with open(config_path, "r") as f:
-            config = json.load(f)
+        config = json.loads(config_path.read_bytes())
 
         assert config["sports"] == ["basketball", "soccer", "tennis"]
         assert config["generation_mode"] == "llm"
@@ -0,0 +1,28 @@
+"""Unit tests for json_codec.py"""
+
+import json
+
+import pytest
+
+import json_codec
+
+
+@pytest.mark.unit
+def test_dumps_is_compact_bytes():
+    """Test that dumps returns compact UTF-8 JSON with no whitespace."""
+    data = json_codec.dumps({"sport": "soccer", "lines": [3, 14]})
+    assert data == b'{"sport":"soccer","lines":[3,14]}'
+
+
+@pytest.mark.unit
+def test_dumps_pretty_matches_stdlib_indent():
+    """Test that pretty output matches json.dumps(indent=2) with or without orjson."""
+    obj = {"sport": "soccer", "llm": {"provider": "together"}, "sports": ["a", "b"]}
+    assert json_codec.dumps_pretty(obj) == json.dumps(obj, indent=2).encode()
+
+
+@pytest.mark.unit
+def test_loads_accepts_bytes_and_str():
+    """Test that loads parses both file bytes and text lines."""
+    assert json_codec.loads(b'{"a": 1}') == {"a": 1}
+    assert json_codec.loads('{"a": 1}\n') == {"a": 1}
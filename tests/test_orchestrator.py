@@ -9,59 +9,61 @@ import subprocess
 import sys
 from pathlib import Path
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def run_orchestrator(tmp_path, monkeypatch):
+    """Run the full workflow in-process inside tmp_path.
+
+    The orchestrator resolves config.json, the early execution log and
+    output/ against the working directory, so each test gets its own copy of
+    all three. Returns a callable taking the config path; it returns the exit
+    code and the orchestrator, whose session_dir is relative to tmp_path.
+    """
+    from orchestrator import SportsPoetryOrchestrator
+
+    monkeypatch.chdir(tmp_path)
+
+    def _run(config_path="config.json"):
+        orchestrator = SportsPoetryOrchestrator(config_path=str(config_path))
+        return orchestrator.run(), orchestrator
+
+    return _run
+
+
+def write_config(tmp_path, config):
+    """Write config to tmp_path/config.json and return its path."""
+    config_file = tmp_path / "config.json"
+    with open(config_file, "w") as f:
+        json.dump(config, f)
+    return config_file
 
 
 class TestOrchestratorIntegration:
     """Integration tests for full orchestrator workflow."""
 
     @pytest.mark.integration
-    def test_template_single_sport(self, tmp_path):
+    def test_template_single_sport(self, tmp_path, run_orchestrator):
         """Test full workflow with template mode and one sport."""
-        repo_root = Path(__file__).parent.parent
-        config_path = repo_root / "config.json"
-        backup_path = repo_root / "config.json.pytest_backup"
-
-        # Backup existing config if it exists
-        if config_path.exists():
-            config_path.rename(backup_path)
-
-        try:
-            # Create test config
-            config = {
-                "sports": ["basketball"],
-                "timestamp": "2025-11-01T18:00:00Z",
-                "session_id": "test_integration_single",
-                "retry_enabled": False,
-                "generation_mode": "template"
-            }
-
-            with open(config_path, "w") as f:
-                json.dump(config, f)
-
-            # Run orchestrator
-            result = subprocess.run(
-                [sys.executable, "orchestrator.py"],
-                cwd=repo_root,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-
-            # Check it succeeded
-            assert result.returncode == 0, f"Orchestrator failed: {result.stderr}"
-
-            # Check output files exist
-            output_dir = repo_root / "output" / "test_integration_single"
-            assert output_dir.exists()
-
-        finally:
-            # Restore original config
-            if config_path.exists():
-                config_path.unlink()
-            if backup_path.exists():
-                backup_path.rename(config_path)
+        config_file = write_config(tmp_path, {
+            "sports": ["basketball"],
+            "timestamp": "2025-11-01T18:00:00Z",
+            "session_id": "test_integration_single",
+            "retry_enabled": False,
+            "generation_mode": "template"
+        })
+
+        # Run orchestrator
+        exit_code, orchestrator = run_orchestrator(config_file)
+
+        # Check it succeeded
+        assert exit_code == 0
+
+        # Check output files exist (session ids are generated at run time)
+        output_dir = tmp_path / orchestrator.session_dir
+        assert output_dir.exists()
 
         basketball_dir = output_dir / "basketball"
         assert basketball_dir.exists()
@@ -81,37 +83,25 @@ class TestOrchestratorIntegration:
         # Check analysis report
         assert (output_dir / "analysis_report.md").exists()
 
-    @pytest.mark.skip(reason="TODO: Fix backup/restore pattern for multiple tests")
     @pytest.mark.integration
-    def test_template_multiple_sports(self, tmp_path):
+    def test_template_multiple_sports(self, tmp_path, run_orchestrator):
         """Test full workflow with template mode and multiple sports."""
-        # Create config
-        config = {
+        config_file = write_config(tmp_path, {
             "sports": ["basketball", "soccer", "tennis"],
             "timestamp": "2025-11-01T18:00:00Z",
             "session_id": "test_integration_multi",
             "retry_enabled": False,
             "generation_mode": "template"
-        }
-
-        config_file = tmp_path / "config.json"
-        with open(config_file, "w") as f:
-            json.dump(config, f)
+        })
 
         # Run orchestrator
-        result = subprocess.run(
-            [sys.executable, "orchestrator.py"],
-            cwd=Path(__file__).parent.parent,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        exit_code, orchestrator = run_orchestrator(config_file)
 
         # Check it succeeded
-        assert result.returncode == 0, f"Orchestrator failed: {result.stderr}"
+        assert exit_code == 0
 
         # Check all sports generated
-        output_dir = Path(__file__).parent.parent / "output" / "test_integration_multi"
+        output_dir = tmp_path / orchestrator.session_dir
 
         for sport in ["basketball", "soccer", "tennis"]:
             sport_dir = output_dir / sport
@@ -126,14 +116,12 @@ class TestOrchestratorIntegration:
         assert "soccer" in analysis.lower()
         assert "tennis" in analysis.lower()
 
-    @pytest.mark.skip(reason="TODO: Fix backup/restore pattern")
     @pytest.mark.integration
     @pytest.mark.requires_api_key
     @pytest.mark.slow
-    def test_llm_single_sport(self, tmp_path, api_key):
+    def test_llm_single_sport(self, tmp_path, api_key, monkeypatch, run_orchestrator):
         """Test full workflow with LLM mode."""
-        # Create config
-        config = {
+        config_file = write_config(tmp_path, {
             "sports": ["cricket"],
             "timestamp": "2025-11-01T18:00:00Z",
             "session_id": "test_integration_llm",
@@ -141,32 +129,17 @@ class TestOrchestratorIntegration:
             "generation_mode": "llm",
             "llm_provider": "together",
             "llm_model": "meta-llama/Llama-3.3-70B-Instruct-Turbo-Free"
-        }
-
-        config_file = tmp_path / "config.json"
-        with open(config_file, "w") as f:
-            json.dump(config, f)
+        })
 
         # Run orchestrator with API key
-        env = {
-            "PYTHONPATH": str(Path(__file__).parent.parent),
-            "TOGETHER_API_KEY": api_key
-        }
-
-        result = subprocess.run(
-            [sys.executable, "orchestrator.py"],
-            cwd=Path(__file__).parent.parent,
-            env=env,
-            capture_output=True,
-            text=True,
-            timeout=120  # LLM takes longer
-        )
+        monkeypatch.setenv("TOGETHER_API_KEY", api_key)
+        exit_code, orchestrator = run_orchestrator(config_file)
 
         # Check it succeeded
-        assert result.returncode == 0, f"Orchestrator failed: {result.stderr}"
+        assert exit_code == 0
 
         # Check output files
-        output_dir = Path(__file__).parent.parent / "output" / "test_integration_llm"
+        output_dir = tmp_path / orchestrator.session_dir
         cricket_dir = output_dir / "cricket"
 
         assert (cricket_dir / "haiku.txt").exists()
@@ -183,36 +156,49 @@ class TestOrchestratorIntegration:
         haiku = (cricket_dir / "haiku.txt").read_text()
         assert "Athletes prepare well" not in haiku  # Not default template
 
-    @pytest.mark.skip(reason="TODO: Fix backup/restore pattern")
     @pytest.mark.integration
-    def test_session_directory_creation(self, tmp_path):
-        """Test that session directories are created correctly."""
-        config = {
+    def test_cli_entry_point(self, tmp_path):
+        """Test that the command-line entry point runs a config end-to-end."""
+        config_file = write_config(tmp_path, {
             "sports": ["basketball"],
             "timestamp": "2025-11-01T18:00:00Z",
-            "session_id": "test_session_dir",
+            "session_id": "test_cli",
             "retry_enabled": False,
             "generation_mode": "template"
-        }
-
-        config_file = tmp_path / "config.json"
-        with open(config_file, "w") as f:
-            json.dump(config, f)
+        })
 
-        # Run orchestrator
         result = subprocess.run(
-            [sys.executable, "orchestrator.py"],
-            cwd=Path(__file__).parent.parent,
+            [sys.executable, str(REPO_ROOT / "orchestrator.py"),
+             "--config", str(config_file), "--quiet"],
+            cwd=tmp_path,
             capture_output=True,
             text=True,
             timeout=30
         )
 
-        assert result.returncode == 0
+        assert result.returncode == 0, f"Orchestrator failed: {result.stderr}"
+        assert (tmp_path / "output" / "latest" / "analysis_report.md").exists()
+        assert result.stdout == ""  # --quiet silences events and agent progress
+
+    @pytest.mark.integration
+    def test_session_directory_creation(self, tmp_path, run_orchestrator):
+        """Test that session directories are created correctly."""
+        config_file = write_config(tmp_path, {
+            "sports": ["basketball"],
+            "timestamp": "2025-11-01T18:00:00Z",
+            "session_id": "test_session_dir",
+            "retry_enabled": False,
+            "generation_mode": "template"
+        })
+
+        # Run orchestrator
+        exit_code, orchestrator = run_orchestrator(config_file)
+
+        assert exit_code == 0
 
         # Check session directory exists
-        output_dir = Path(__file__).parent.parent / "output"
-        session_dir = output_dir / "test_session_dir"
+        output_dir = tmp_path / "output"
+        session_dir = tmp_path / orchestrator.session_dir
         assert session_dir.exists()
         assert session_dir.is_dir()
 
@@ -222,99 +208,181 @@ class TestOrchestratorIntegration:
         assert latest_link.is_symlink()
 
     @pytest.mark.integration
-    def test_logging_creates_files(self, tmp_path):
+    def test_logging_creates_files(self, tmp_path, run_orchestrator):
         """Test that execution logs are created in session directory."""
-        repo_root = Path(__file__).parent.parent
-        config_path = repo_root / "config.json"
-        backup_path = repo_root / "config.json.pytest_backup"
-
-        # Backup existing config if it exists
-        if config_path.exists():
-            config_path.rename(backup_path)
-
-        try:
-            # Create test config
-            config = {
-                "sports": ["basketball"],
-                "timestamp": "2025-11-01T18:00:00Z",
-                "session_id": "test_logging",
-                "retry_enabled": False,
-                "generation_mode": "template"
-            }
-
-            with open(config_path, "w") as f:
-                json.dump(config, f)
-
-            # Run orchestrator
-            result = subprocess.run(
-                [sys.executable, "orchestrator.py"],
-                cwd=repo_root,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-
-            assert result.returncode == 0
-
-            # Check logs were written to session directory
-            session_dir = repo_root / "output" / "test_logging"
-            log_file = session_dir / "execution_log.jsonl"
-            assert log_file.exists(), f"Execution log not found at {log_file}"
-
-            # Verify log has entries
-            with open(log_file) as f:
-                entries = f.readlines()
-            assert len(entries) > 0, "No log entries written"
-
-            # Check usage log in session directory
-            usage_log = session_dir / "usage_log.jsonl"
-            assert usage_log.exists(), f"Usage log not found at {usage_log}"
-
-        finally:
-            # Restore original config
-            if config_path.exists():
-                config_path.unlink()
-            if backup_path.exists():
-                backup_path.rename(config_path)
+        config_file = write_config(tmp_path, {
+            "sports": ["basketball"],
+            "timestamp": "2025-11-01T18:00:00Z",
+            "session_id": "test_logging",
+            "retry_enabled": False,
+            "generation_mode": "template"
+        })
+
+        # Run orchestrator
+        exit_code, orchestrator = run_orchestrator(config_file)
+
+        assert exit_code == 0
+
+        # Check logs were written to session directory
+        session_dir = tmp_path / orchestrator.session_dir
+        log_file = session_dir / "execution_log.jsonl"
+        assert log_file.exists(), f"Execution log not found at {log_file}"
+
+        # Verify log has entries
+        with open(log_file) as f:
+            assert next(f, None) is not None, "No log entries written"
+
+        # Check usage log in session directory
+        usage_log = session_dir / "usage_log.jsonl"
+        assert usage_log.exists(), f"Usage log not found at {usage_log}"
+
+        # Early log was moved, not left behind in the working directory
+        assert not (tmp_path / "execution_log.jsonl").exists()
+
+
+class TestProvenanceLogger:
+    """Unit tests for ProvenanceLogger."""
+
+    @pytest.mark.unit
+    def test_log_event_writes_iso_timestamps(self, tmp_path):
+        """Test that each logged event carries a parseable UTC ISO timestamp."""
+        from datetime import datetime, timezone
+        from orchestrator import ProvenanceLogger
+
+        log_file = tmp_path / "execution_log.jsonl"
+        logger = ProvenanceLogger(str(log_file))
+        logger.log_event("orchestrator", "first")
+        logger.log_event("orchestrator", "second", details={"n": 2})
+        logger.close()
+
+        entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+        assert [e["action"] for e in entries] == ["first", "second"]
+        for entry in entries:
+            parsed = datetime.fromisoformat(entry["timestamp"])
+            assert parsed.tzinfo == timezone.utc
+        assert entries[0]["timestamp"] <= entries[1]["timestamp"]
+
+    @pytest.mark.unit
+    def test_flush_writes_events_from_many_threads(self, tmp_path):
+        """Test that flush() returns only after all queued events are on disk."""
+        import concurrent.futures
+        from orchestrator import ProvenanceLogger
+
+        log_file = tmp_path / "execution_log.jsonl"
+        logger = ProvenanceLogger(str(log_file))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            for i in range(200):
+                executor.submit(logger.log_event, f"agent_{i % 4}", "tick", {"i": i})
+        logger.flush()
+
+        entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+        assert sorted(e["details"]["i"] for e in entries) == list(range(200))
+        logger.close()
+
+    @pytest.mark.unit
+    def test_echo_disabled_still_logs(self, tmp_path, capsys):
+        """Test that echo=False silences stdout but still writes the event."""
+        from orchestrator import ProvenanceLogger
+
+        log_file = tmp_path / "execution_log.jsonl"
+        logger = ProvenanceLogger(str(log_file), echo=False)
+        logger.log_event("orchestrator", "start", message="Starting")
+        logger.close()
+
+        assert capsys.readouterr().out == ""
+        assert json.loads(log_file.read_text())["message"] == "Starting"
+
+    @pytest.mark.unit
+    def test_close_stops_writer(self, tmp_path):
+        """Test that close() writes pending events and ends the writer thread."""
+        from orchestrator import ProvenanceLogger
+
+        log_file = tmp_path / "execution_log.jsonl"
+        logger = ProvenanceLogger(str(log_file), echo=False)
+        logger.log_event("orchestrator", "first")
+        writer = logger._writer
+        logger.close()
+
+        assert not writer.is_alive()
+        assert len(log_file.read_text().splitlines()) == 1
+        logger.flush()  # Returns at once with no writer running
+
+        # Logging after close() starts a fresh writer
+        logger.log_event("orchestrator", "second")
+        logger.close()
+        assert len(log_file.read_text().splitlines()) == 2
+
+    @pytest.mark.unit
+    def test_flush_returns_after_writer_error(self, tmp_path, monkeypatch, capsys):
+        """Test that an unexpected error in a batch neither kills the writer nor hangs flush()."""
+        import threading
+        from orchestrator import ProvenanceLogger
+
+        log_file = tmp_path / "execution_log.jsonl"
+        logger = ProvenanceLogger(str(log_file), echo=False)
+
+        def broken(now):
+            raise ValueError("bad timestamp")
+
+        monkeypatch.setattr(logger, "_format_timestamp", broken)
+        logger.log_event("orchestrator", "lost")
+        flusher = threading.Thread(target=logger.flush)
+        flusher.start()
+        flusher.join(timeout=5)
+        assert not flusher.is_alive()
+        assert "bad timestamp" in capsys.readouterr().err
+
+        # The same writer keeps handling later events
+        monkeypatch.undo()
+        logger.log_event("orchestrator", "kept")
+        logger.close()
+        assert json.loads(log_file.read_text())["action"] == "kept"
+
+    @pytest.mark.unit
+    def test_close_while_logging_loses_nothing(self, tmp_path):
+        """Test that events logged while close() runs are still written."""
+        import threading
+        from orchestrator import ProvenanceLogger
+
+        log_file = tmp_path / "execution_log.jsonl"
+        logger = ProvenanceLogger(str(log_file), echo=False)
+
+        def produce():
+            for i in range(500):
+                logger.log_event("agent", "tick", {"i": i})
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        while producer.is_alive():
+            logger.close()
+        producer.join()
+        logger.close()
+
+        entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+        assert sorted(e["details"]["i"] for e in entries) == list(range(500))
 
 
 class TestErrorHandling:
     """Test orchestrator error handling."""
 
-    @pytest.mark.skip(reason="TODO: Fix to use proper config backup/restore")
     @pytest.mark.integration
-    def test_missing_config_file(self):
+    def test_missing_config_file(self, capsys, run_orchestrator):
         """Test error when config file doesn't exist."""
-        # Remove config.json temporarily
-        config_path = Path(__file__).parent.parent / "config.json"
-        backup_path = Path(__file__).parent.parent / "config.json.test_backup"
-
-        if config_path.exists():
-            config_path.rename(backup_path)
-
-        try:
-            result = subprocess.run(
-                [sys.executable, "orchestrator.py"],
-                cwd=Path(__file__).parent.parent,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            # Should fail
-            assert result.returncode != 0
-            assert "Error" in result.stderr or "error" in result.stderr.lower()
-
-        finally:
-            # Restore config
-            if backup_path.exists():
-                backup_path.rename(config_path)
-
-    @pytest.mark.skip(reason="TODO: Fix to use proper config backup/restore")
+        # tmp_path (the working directory) has no config.json
+        exit_code, _ = run_orchestrator()
+
+        # Should fail
+        assert exit_code != 0
+        assert "Failed to read config" in capsys.readouterr().out
+
     @pytest.mark.integration
-    def test_llm_mode_without_api_key(self, tmp_path):
-        """Test clear error when LLM mode used without API key."""
-        config = {
+    def test_llm_mode_without_api_key(self, tmp_path, monkeypatch, run_orchestrator):
+        """Test that agents fail with a clear error when LLM mode has no API key.
+
+        Agent failures are recorded in the execution log; the workflow itself
+        still completes and the analyzer reports on whatever succeeded.
+        """
+        config_file = write_config(tmp_path, {
             "sports": ["cricket"],
             "timestamp": "2025-11-01T18:00:00Z",
             "session_id": "test_no_api_key",
@@ -322,30 +390,20 @@ class TestErrorHandling:
             "generation_mode": "llm",
             "llm_provider": "together",
             "llm_model": "meta-llama/Llama-3.3-70B-Instruct-Turbo-Free"
-        }
-
-        config_file = tmp_path / "config.json"
-        with open(config_file, "w") as f:
-            json.dump(config, f)
+        })
 
-        # Run without API key in environment
-        env = {"PYTHONPATH": str(Path(__file__).parent.parent)}
-        # Explicitly unset API keys
-        env["TOGETHER_API_KEY"] = ""
-        env["HUGGINGFACE_API_TOKEN"] = ""
+        # Explicitly unset API keys; no need to wait out the retry backoff
+        monkeypatch.setenv("TOGETHER_API_KEY", "")
+        monkeypatch.setenv("HUGGINGFACE_API_TOKEN", "")
+        monkeypatch.setattr("orchestrator.RETRY_BACKOFF_S", 0)
 
-        result = subprocess.run(
-            [sys.executable, "orchestrator.py"],
-            cwd=Path(__file__).parent.parent,
-            env=env,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        exit_code, orchestrator = run_orchestrator(config_file)
 
-        # Should fail
-        assert result.returncode != 0
+        assert exit_code == 0
 
-        # Check error message is clear
-        output = result.stdout + result.stderr
-        assert "API" in output or "key" in output.lower()
+        # Check each attempt logged a clear failure
+        log_file = tmp_path / orchestrator.session_dir / "execution_log.jsonl"
+        entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+        failures = [e for e in entries if e["actor"] == "agent_cricket" and e["action"] == "failed"]
+        assert failures
+        assert all("API token" in e["details"]["error"] for e in failures)
@@ -1,16 +1,16 @@
 """Unit tests for poetry_agent.py"""
 
 import pytest
-from pathlib import Path
-import sys
-
-# Add parent directory to path to import modules
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from types import SimpleNamespace
 
+import poetry_agent
 from poetry_agent import (
     generate_haiku,
     generate_sonnet,
+    generate_llm_poems,
     count_words,
+    collect_lines,
+    render_poem,
     HAIKU_TEMPLATES,
     SONNET_TEMPLATES
 )
@@ -26,8 +26,7 @@ class TestTemplateMode:
 
         assert isinstance(haiku, list)
         assert len(haiku) == 3  # Haiku has 3 lines
-        assert all(isinstance(line, str) for line in haiku)
-        assert all(len(line) > 0 for line in haiku)
+        assert all(isinstance(line, str) and line for line in haiku)  # Non-empty strings
 
     @pytest.mark.unit
     def test_generate_haiku_soccer(self):
@@ -91,29 +90,41 @@ class TestWordCounting:
     """Tests for word counting functionality."""
 
     @pytest.mark.unit
-    def test_count_words_simple(self):
-        """Test word counting with simple lines."""
-        lines = ["Hello world", "This is a test"]
-        assert count_words(lines) == 6
+    @pytest.mark.parametrize("lines,expected", [
+        (["Hello world", "This is a test"], 6),
+        # "Orange sphere in flight" = 4, "Swish through the net crowd erupts" = 6, "Victory is sweet" = 3
+        (["Orange sphere in flight,", "Swish through the net, crowd erupts—", "Victory is sweet."], 13),
+        ([], 0),
+        (["Hello world", "", "Test"], 3),
+    ], ids=["simple", "haiku", "empty", "blank_lines"])
+    def test_count_words(self, lines, expected):
+        """Test word counting, including empty input and blank lines."""
+        assert count_words(lines) == expected
 
     @pytest.mark.unit
-    def test_count_words_haiku(self):
-        """Test word counting with actual haiku."""
-        haiku = ["Orange sphere in flight,", "Swish through the net, crowd erupts—", "Victory is sweet."]
-        count = count_words(haiku)
-        # "Orange sphere in flight" = 4, "Swish through the net crowd erupts" = 6, "Victory is sweet" = 3
-        assert count == 13
+    def test_render_poem(self):
+        """Test rendering returns UTF-8 file contents, line count, and word count."""
+        data, line_count, words = render_poem(HAIKU_TEMPLATES["basketball"])
+        assert data.decode("utf-8") == "\n".join(HAIKU_TEMPLATES["basketball"]) + "\n"
+        assert line_count == 3
+        assert words == count_words(HAIKU_TEMPLATES["basketball"])
+
+
+class TestCollectLines:
+    """Tests for parsing streamed LLM output into lines."""
 
     @pytest.mark.unit
-    def test_count_words_empty(self):
-        """Test word counting with empty list."""
-        assert count_words([]) == 0
+    def test_lines_split_across_chunks(self):
+        """Test that lines are reassembled across chunk boundaries."""
+        chunks = ["Swi", "sh\n\n  net", " falls\nCrowd ", "roars"]
+        assert collect_lines(iter(chunks)) == ["Swish", "net falls", "Crowd roars"]
 
     @pytest.mark.unit
-    def test_count_words_blank_lines(self):
-        """Test word counting ignores blank lines."""
-        lines = ["Hello world", "", "Test"]
-        assert count_words(lines) == 3
+    def test_stops_reading_at_limit(self):
+        """Test that no chunks are consumed after the limit is reached."""
+        chunks = iter(["one\ntwo\n", "three\n", "four\n"])
+        assert collect_lines(chunks, limit=2) == ["one", "two"]
+        assert next(chunks) == "three\n"
 
 
 class TestLLMMode:
@@ -133,8 +144,7 @@ class TestLLMMode:
 
         assert isinstance(haiku, list)
         assert len(haiku) >= 3  # Should have at least 3 lines
-        assert all(isinstance(line, str) for line in haiku)
-        assert all(len(line) > 0 for line in haiku)
+        assert all(isinstance(line, str) and line for line in haiku)  # Non-empty strings
 
         # Should NOT be the default template
         default_haiku = HAIKU_TEMPLATES["default"]
@@ -185,6 +195,77 @@ class TestLLMMode:
         assert haiku1 != haiku2
 
 
+class FakeStream:
+    """Streamed completion yielding one text piece per chunk."""
+
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        for piece in self.pieces:
+            self.consumed += 1
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+    def close(self):
+        self.closed = True
+
+
+class FakeCompletions:
+    """Stands in for client.chat.completions, returning canned text."""
+
+    def __init__(self):
+        self.pieces = []
+        self.calls = []
+        self.stream = None
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if kwargs.get("stream"):
+            self.stream = FakeStream(self.pieces)
+            return self.stream
+        text = "".join(self.pieces)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+
+@pytest.fixture
+def fake_together(monkeypatch):
+    """Route Together.ai calls to canned completions instead of the network."""
+    completions = FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(poetry_agent, "_together_client", lambda api_token: client)
+    return completions
+
+
+class TestLLMModeOffline:
+    """Tests for the Together.ai code path against a fake client."""
+
+    @pytest.mark.unit
+    def test_haiku_streams_first_three_lines(self, fake_together):
+        """Test that the haiku stream is cut off after three lines."""
+        fake_together.pieces = ["Bat meets ", "ball\nWillow", " sings\n\nRuns\n", "Extra line\n", "More\n"]
+
+        haiku = generate_haiku("cricket", generation_mode="llm", llm_model="test-model",
+                               api_token="test-token", llm_provider="together")
+
+        assert haiku == ["Bat meets ball", "Willow sings", "Runs"]
+        assert fake_together.calls[0]["model"] == "test-model"
+        assert fake_together.stream.consumed < len(fake_together.pieces)
+        assert fake_together.stream.closed
+
+    @pytest.mark.unit
+    def test_sonnet_drops_blank_lines(self, fake_together):
+        """Test that the sonnet response is split into stripped, non-empty lines."""
+        fake_together.pieces = ["  Line one\n\nLine two  \n", "Line three\n"]
+
+        sonnet = generate_sonnet("cricket", generation_mode="llm", llm_model="test-model",
+                                 api_token="test-token", llm_provider="together")
+
+        assert sonnet == ["Line one", "Line two", "Line three"]
+        assert "stream" not in fake_together.calls[0]
+
+
 class TestErrorHandling:
     """Tests for error handling."""
 
@@ -211,3 +292,40 @@ class TestErrorHandling:
                 api_token="fake_key",
                 llm_provider="together"
             )
+
+    @pytest.mark.unit
+    def test_llm_poems_without_api_key(self):
+        """Test that the paired LLM request reports which poem failed."""
+        with pytest.raises(RuntimeError, match="Failed to generate haiku"):
+            generate_llm_poems(
+                "cricket",
+                llm_model="meta-llama/Llama-3.3-70B-Instruct-Turbo-Free",
+                api_token=None,
+                llm_provider="together"
+            )
+
+    @pytest.mark.unit
+    def test_haiku_failure_does_not_wait_for_sonnet(self, monkeypatch):
+        """Test that a haiku failure is raised while the sonnet is still in flight."""
+        import threading
+        import time
+
+        release = threading.Event()
+
+        def slow_sonnet(*args):
+            release.wait(timeout=5)
+            return ["sonnet"]
+
+        def failing_haiku(*args):
+            raise RuntimeError("429 Too Many Requests")
+
+        monkeypatch.setattr(poetry_agent, "generate_sonnet", slow_sonnet)
+        monkeypatch.setattr(poetry_agent, "generate_haiku", failing_haiku)
+
+        start = time.monotonic()
+        try:
+            with pytest.raises(RuntimeError, match="Failed to generate haiku: 429"):
+                generate_llm_poems("cricket", "test-model", "test-token", "together")
+            assert time.monotonic() - start < 1
+        finally:
+            release.set()